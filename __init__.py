@@ -16,8 +16,9 @@ from .schemas.xsc.redcaptcha import CaptchaXSC, CaptchaXSCV2
 from .encrypt.xs_encrypt import XsEncrypt
 from .encrypt.xsc_encrypt import XscEncrypt
 from .encrypt.generate_local_id import generate_local_id, generate_web_id
+from .encrypt.validation import configure
 
-__all__ = ['encrypt', 'xhs', 'XsEncrypt', 'code', 'CaptchaXSC', 'CaptchaXSCV2', 'XscEncrypt', 'generate_local_id', 'generate_web_id']
+__all__ = ['encrypt', 'xhs', 'XsEncrypt', 'code', 'CaptchaXSC', 'CaptchaXSCV2', 'XscEncrypt', 'generate_local_id', 'generate_web_id', 'configure']
 
 
 def get_version():
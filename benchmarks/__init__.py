@@ -0,0 +1,9 @@
+"""
+XHShow 性能基准
+
+离线运行的签名/请求相关基准脚本 不依赖网络
+
+    python -m xhshow.benchmarks -o result.json              # 校验黄金向量并运行全部基准
+    python -m xhshow.benchmarks -b result.json -t 0.2       # 与基线比较 慢20%以上返回非零状态码
+    python -m xhshow.benchmarks.bench_batch_signing         # 单项基准
+"""
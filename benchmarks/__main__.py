@@ -0,0 +1,48 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .suite import GOLDEN_PATH, check_golden, compare, golden_outputs, run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m xhshow.benchmarks", description="签名函数基准测试")
+    parser.add_argument("-o", "--output", help="结果JSON的输出路径")
+    parser.add_argument("-b", "--baseline", help="用于比较的基线结果JSON")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2, help="回归阈值 默认0.2即慢20%%以上视为回归")
+    parser.add_argument("-k", "--select", help="只运行名称中包含该字符串的用例")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每个用例的最短计时时间(秒)")
+    parser.add_argument("--update-golden", action="store_true", help="用当前实现重新生成黄金向量")
+    args = parser.parse_args(argv)
+
+    if args.update_golden:
+        GOLDEN_PATH.write_text(json.dumps(golden_outputs(), ensure_ascii=False, indent=2) + "\n", encoding='utf-8')
+        print(f"已更新黄金向量: {GOLDEN_PATH}")
+        return 0
+
+    errors = check_golden()
+    for error in errors:
+        print(f"[golden] {error}")
+    if errors:
+        return 2
+
+    result = run(args.select, args.min_time)
+    width = max(map(len, result["results"]), default=0)
+    for name, cost in result["results"].items():
+        print(f"{name:<{width}}  {cost:12.2f} us")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding='utf-8')
+
+    if args.baseline:
+        regressions = compare(result, json.loads(Path(args.baseline).read_text(encoding='utf-8')), args.threshold)
+        for regression in regressions:
+            print(f"[regression] {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import time
+
+from xhshow.encrypt import XscEncrypt, XsEncrypt
+from xhshow.schemas.xsc.redcaptcha import CaptchaXSCV2
+
+A1 = "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995"
+URI = "/api/sns/web/v1/user_posted"
+
+
+def build_requests(count: int) -> list:
+    """构造一批分页请求 (uri, payload, a1, ts)"""
+    ts = int(time.time() * 1000)
+    requests = []
+    for page in range(count):
+        params = {"num": 30, "cursor": f"cursor_{page}", "user_id": "5f2b6d0e000000000101d1c1",
+                  "image_formats": "jpg,webp,avif"}
+        payload = "?" + json.dumps(params, separators=(',', ':'), ensure_ascii=False)
+        requests.append((URI, payload, A1, str(ts + page)))
+    return requests
+
+
+async def sign_per_call(requests: list) -> list:
+    """逐个 await 单次签名接口"""
+    result = []
+    for uri, payload, a1, ts in requests:
+        xs = await XsEncrypt.encrypt_xs(url=uri + payload, a1=a1, ts=ts)
+        xsc = await XscEncrypt.b64_encode(await XscEncrypt.encrypt_xsc(
+            xs=xs, xt=ts, platform=CaptchaXSCV2.platform, a1=a1,
+            x1=CaptchaXSCV2.x1, x4=CaptchaXSCV2.x4, b1=CaptchaXSCV2.b1))
+        result.append((xs, ts, xsc))
+    return result
+
+
+def sign_batch(requests: list) -> list:
+    return XscEncrypt.encrypt_xsc_many(requests, platform=CaptchaXSCV2.platform, x1=CaptchaXSCV2.x1,
+                                       x4=CaptchaXSCV2.x4, b1=CaptchaXSCV2.b1)
+
+
+def main(count: int = 500, rounds: int = 5):
+    requests = build_requests(count)
+
+    per_call = asyncio.run(sign_per_call(requests))
+    batch = sign_batch(requests)
+    assert per_call == batch, "批量签名结果与逐个签名不一致"
+
+    best_per_call = min(_timed(lambda: asyncio.run(sign_per_call(requests))) for _ in range(rounds))
+    best_batch = min(_timed(lambda: sign_batch(requests)) for _ in range(rounds))
+
+    print(f"请求数量: {count}")
+    print(f"逐个签名: {count / best_per_call:,.0f} 次/秒")
+    print(f"批量签名: {count / best_batch:,.0f} 次/秒")
+    print(f"加速比:   {best_per_call / best_batch:.2f}x")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
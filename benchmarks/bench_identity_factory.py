@@ -0,0 +1,23 @@
+import time
+
+from xhshow.encrypt.generate_local_id import IdentityFactory, generate_id_pair
+
+
+def main(count: int = 1_000_000, per_call_count: int = 100_000):
+    start = time.perf_counter()
+    for _ in range(per_call_count):
+        generate_id_pair("other")
+    per_call = per_call_count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    identities = IdentityFactory().generate(count)
+    elapsed = time.perf_counter() - start
+    assert len(identities) == count and len(set(a1 for a1, _ in identities)) == count
+
+    print(f"逐个生成 ({per_call_count:,} 个): {per_call:12,.0f} 个/秒")
+    print(f"批量生成 ({count:,} 个): {count / elapsed:12,.0f} 个/秒  耗时 {elapsed:.2f} 秒")
+    print(f"加速比: {count / elapsed / per_call:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
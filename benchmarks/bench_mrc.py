@@ -0,0 +1,41 @@
+import random
+import time
+
+from xhshow.encrypt.mrc import mrc_reference, mrc_zlib
+from xhshow.schemas.xsc.redcaptcha import CaptchaXSCV2
+
+XS = "XYW_eyJzaWduU3ZuIjoiNTYiLCJzaWduVHlwZSI6IngyIiwiYXBwSUQiOiJ4aHMtcGMtd2ViIiwic2lnblZlcnNpb24iOiIxIiwicGF5bG9hZCI6IjAwNzQ3YjBjYmJkZGE3YzQxYTcwOGRkY2I2MGFlYjYwZDY1MGU5MjcwODFiZmU4Mjg1NjNkMTY0NWY3ZDdjOWU2MzA0NDJlY2QyY2Y4ZDcyYzUzZWJjOGE0Zjg2MzFhMWU2MDFjODMzNWVkZmZmZmY5NDA2YjEzMjU2MGQ4MGFhNzUwNjJjZmFmYzA3Y2Y1ODJkZGNlY2Q2YmU3OGEyM2NjNWE4NjI0ZjRlM2Y3ODY5YzAwZjNkZWYzOGI0ZDdjZjExMThkNjcyYjBhMDczZDMxYWNjODgxYzJmMzg3YmQ1YWYwNzYxY2M2OWU4YzVmMjBjY2JkNGIwODI4YTlhN2FhZmJlNTJiOWNmYjgwMzY3YmU1YmRkNDhmYmU0MDk2YSJ9"
+B64_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def build_inputs(count: int) -> list:
+    """构造 xt + xs + b1 形式的输入 b1 使用真实指纹及同长度的随机指纹"""
+    rng = random.Random(0)
+    xt = 1732352811091
+    inputs = [f"{xt}{XS}{CaptchaXSCV2.b1}"]
+    for i in range(1, count):
+        b1 = ''.join(rng.choice(B64_CHARS) for _ in range(len(CaptchaXSCV2.b1) + rng.randint(-200, 600)))
+        inputs.append(f"{xt + i}{XS}{b1}")
+    return inputs
+
+
+def main(count: int = 200, rounds: int = 5):
+    inputs = build_inputs(count)
+    for text in inputs:
+        assert mrc_zlib(text) == mrc_reference(text), "zlib实现与参考实现不一致"
+
+    print(f"输入数量: {count}, 平均长度: {sum(map(len, inputs)) // count}")
+    for name, fn in (("reference", mrc_reference), ("zlib", mrc_zlib)):
+        best = min(_timed(fn, inputs) for _ in range(rounds))
+        print(f"{name:10}: {best / count * 1e6:8.2f} us/次")
+
+
+def _timed(fn, inputs) -> float:
+    start = time.perf_counter()
+    for text in inputs:
+        fn(text)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+对比 POST 请求体的两种处理方式 生成签名头并得到待发送请求体的耗时
+
+旧: 签名时 json.dumps 一次得到 str, 发送时 curl_cffi 再 json.dumps 一次并编码
+新: AsyncRequestFramework._build_request 用 codec 序列化一次 签名与发送使用同一份 bytes
+
+    python -m xhshow.benchmarks.bench_request_body
+"""
+import json
+import time
+
+from xhshow.encrypt import get_signing_identity
+from xhshow.schemas.xsc.redcaptcha import CaptchaXSCV2
+from xhshow.xhs.request.codec import get_codec
+
+A1 = "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995"
+URI = "/api/sns/web/v1/search/notes"
+XT = "1732352811091"
+BODY = {
+    "keyword": "露营装备推荐",
+    "page": 1,
+    "page_size": 20,
+    "search_id": "2e1f9h3ovq0l2mhw0qjtc",
+    "sort": "general",
+    "note_type": 0,
+    "ext_flags": [],
+    "filters": [{"tags": ["general"], "type": "sort_type"}, {"tags": ["不限"], "type": "filter_note_type"}],
+    "geo": "",
+    "image_formats": ["jpg", "webp", "avif"],
+}
+
+
+def old(identity, body):
+    signed = identity.sign(URI, json.dumps(body, separators=(',', ':'), ensure_ascii=False), XT)
+    sent = json.dumps(body).encode()
+    return signed, sent
+
+
+def new(identity, body, codec):
+    sent = codec.dumps(body)
+    return identity.sign(URI, sent, XT), sent
+
+
+def _best(fn, count: int, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(count):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def main(count: int = 5000, rounds: int = 5):
+    identity = get_signing_identity(A1, CaptchaXSCV2)
+    codecs = [get_codec("json")]
+    try:
+        codecs.append(get_codec("orjson"))
+    except ImportError:
+        pass
+
+    old_sign, old_sent = old(identity, BODY)
+    print(f"旧方式签名与发送的请求体是否一致: {old_sent.decode() == json.dumps(BODY, separators=(',', ':'), ensure_ascii=False)}")
+
+    print(f"{'方式':14}{'每次':>12}")
+    print(f"{'old':16}{_best(lambda: old(identity, BODY), count, rounds):10.2f} us")
+    for codec in codecs:
+        new_sign, new_sent = new(identity, BODY, codec)
+        assert new_sign == old_sign, "签名结果与旧方式不一致"
+        print(f"{'new/' + codec.name:16}{_best(lambda: new(identity, BODY, codec), count, rounds):10.2f} us")
+
+
+if __name__ == '__main__':
+    main()
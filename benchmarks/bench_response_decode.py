@@ -0,0 +1,146 @@
+"""
+对比响应体的几种解码方式
+
+    json      标准库 json.loads
+    orjson    orjson.loads
+    lazy      LazyResponse 只读取 cursor/has_more 等字段(触发一次完整解析)
+    lazy-raw  LazyResponse 不读取字段 如只看状态码或直接转存原始字节
+
+默认使用按主页推荐流与评论接口响应结构生成的数据, 也可以传入抓包保存的响应体文件
+
+    python -m xhshow.benchmarks.bench_response_decode
+    python -m xhshow.benchmarks.bench_response_decode homefeed.json comment_page.json
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from xhshow.xhs.request.codec import LazyResponse, get_codec
+
+
+def _user(rng: random.Random) -> dict:
+    return {
+        "user_id": f"{rng.getrandbits(96):024x}",
+        "nickname": rng.choice(["小红薯", "旅行日记", "今天吃什么", "photographer"]) + str(rng.randint(1, 9999)),
+        "avatar": f"https://sns-avatar-qc.xhscdn.com/avatar/{rng.getrandbits(128):032x}?imageView2/2/w/80/format/jpg",
+        "xsec_token": f"AB{rng.getrandbits(256):064x}=",
+    }
+
+
+def homefeed_payload(items: int = 40, seed: int = 1) -> bytes:
+    """与 /api/sns/web/v1/homefeed 响应结构相同的数据"""
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(items):
+        notes.append({
+            "id": f"{rng.getrandbits(96):024x}",
+            "model_type": "note",
+            "track_id": f"2{rng.getrandbits(120):030x}",
+            "xsec_token": f"AB{rng.getrandbits(256):064x}=",
+            "ignore": False,
+            "note_card": {
+                "type": rng.choice(["normal", "video"]),
+                "display_title": "周末去哪儿玩 | 城市周边露营地合集 第" + str(rng.randint(1, 99)) + "期",
+                "user": _user(rng),
+                "interact_info": {"liked": False, "liked_count": str(rng.randint(0, 100000))},
+                "cover": {
+                    "height": 1440, "width": 1080, "file_id": "", "url": "",
+                    "url_pre": f"http://sns-webpic-qc.xhscdn.com/{rng.getrandbits(160):040x}!nc_n_webp_prv_1",
+                    "url_default": f"http://sns-webpic-qc.xhscdn.com/{rng.getrandbits(160):040x}!nc_n_webp_mw_1",
+                    "info_list": [
+                        {"image_scene": scene,
+                         "url": f"http://sns-webpic-qc.xhscdn.com/{rng.getrandbits(160):040x}!{scene}"}
+                        for scene in ("WB_PRV", "WB_DFT")
+                    ],
+                },
+            },
+        })
+    return json.dumps({
+        "code": 0, "success": True, "msg": "成功",
+        "data": {"cursor_score": f"1.{rng.getrandbits(40)}", "items": notes},
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def comments_payload(comments: int = 10, sub_comments: int = 3, seed: int = 2) -> bytes:
+    """与 /api/sns/web/v2/comment/page 响应结构相同的数据"""
+    rng = random.Random(seed)
+
+    def comment(note_id: str) -> dict:
+        return {
+            "id": f"{rng.getrandbits(96):024x}",
+            "note_id": note_id,
+            "content": "这个地方真的太好看了[哇R] 请问停车方便吗 周末人多不多" * rng.randint(1, 3),
+            "at_users": [],
+            "like_count": str(rng.randint(0, 5000)),
+            "liked": False,
+            "create_time": 1732352811091 + rng.randint(0, 10 ** 8),
+            "ip_location": rng.choice(["上海", "广东", "浙江", "北京"]),
+            "status": 0,
+            "user_info": _user(rng),
+            "show_tags": [],
+            "pictures": [],
+        }
+
+    note_id = f"{rng.getrandbits(96):024x}"
+    items = []
+    for _ in range(comments):
+        item = comment(note_id)
+        item["sub_comment_count"] = str(sub_comments)
+        item["sub_comment_has_more"] = True
+        item["sub_comment_cursor"] = f"{rng.getrandbits(96):024x}"
+        item["sub_comments"] = [comment(note_id) for _ in range(sub_comments)]
+        items.append(item)
+    return json.dumps({
+        "code": 0, "success": True, "msg": "成功",
+        "data": {"cursor": items[-1]["id"], "has_more": True, "time": 1732352811091,
+                 "xsec_token": f"AB{rng.getrandbits(256):064x}=", "user_id": _user(rng)["user_id"],
+                 "comments": items},
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _fields(data) -> tuple:
+    """调用方通常只关心的几个字段"""
+    page = data.get("data", {})
+    return page.get("cursor") or page.get("cursor_score"), page.get("has_more")
+
+
+def _best(fn, count: int, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(count):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def main(paths=None, count: int = 500, rounds: int = 5):
+    if paths:
+        payloads = [(Path(path).name, Path(path).read_bytes()) for path in paths]
+    else:
+        payloads = [("homefeed", homefeed_payload()), ("comment/page", comments_payload())]
+
+    stdlib = get_codec("json")
+    try:
+        fast = get_codec("orjson")
+    except ImportError:
+        fast = None
+        print("未安装 orjson 只对比标准库")
+
+    print(f"{'响应':16}{'大小':>10}{'json':>12}{'orjson':>12}{'lazy':>12}{'lazy-raw':>12}")
+    for name, raw in payloads:
+        codec = fast or stdlib
+        assert _fields(LazyResponse(raw, codec)) == _fields(stdlib.loads(raw))
+        row = [
+            _best(lambda: _fields(stdlib.loads(raw)), count, rounds),
+            _best(lambda: _fields(fast.loads(raw)), count, rounds) if fast else float('nan'),
+            _best(lambda: _fields(LazyResponse(raw, codec)), count, rounds),
+            _best(lambda: LazyResponse(raw, codec).raw, count, rounds),
+        ]
+        print(f"{name:18}{len(raw) / 1024:8.1f}KB" + "".join(f"{us:9.1f} us" for us in row))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
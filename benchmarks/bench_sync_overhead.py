@@ -0,0 +1,73 @@
+"""
+对比 __pre_headers 中逐个 await 异步接口 与 直接调用同步实现 生成一次请求头的耗时
+
+两条路径都运行在事件循环中 输出完全一致 差值即每个请求省去的协程创建与调度开销
+
+    python -m xhshow.benchmarks.bench_sync_overhead
+"""
+import asyncio
+import json
+import time
+
+from xhshow.encrypt import MiscEncrypt, XscEncrypt, XsEncrypt, get_signing_identity
+from xhshow.schemas.xsc.redcaptcha import CaptchaXSCV2
+
+A1 = "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995"
+URI = "/api/sns/web/v1/user_posted"
+PARAMS = {"num": 30, "cursor": "", "user_id": "5f2b6d0e000000000101d1c1", "image_formats": "jpg,webp,avif"}
+
+
+async def headers_async(payload: str, xt: str) -> dict:
+    """每一步都 await 异步兼容接口"""
+    xs = await XsEncrypt.encrypt_xs(url=URI + payload, a1=A1, ts=xt)
+    xsc = await XscEncrypt.b64_encode(await XscEncrypt.encrypt_xsc(
+        xs=xs, xt=xt, platform=CaptchaXSCV2.platform, a1=A1,
+        x1=CaptchaXSCV2.x1, x4=CaptchaXSCV2.x4, b1=CaptchaXSCV2.b1))
+    x_b3 = await MiscEncrypt.x_b3_traceid()
+    return {"x-s": xs, "x-t": xt, "x-s-common": xsc,
+            "x-b3-traceid": x_b3, "x-xray-traceid": await MiscEncrypt.x_xray_traceid(x_b3)}
+
+
+def headers_sync(payload: str, xt: str) -> dict:
+    """与 AsyncRequestFramework.__pre_headers 相同 全部调用同步实现"""
+    xs, xt, xsc = get_signing_identity(A1, CaptchaXSCV2).sign(URI, payload, xt)
+    x_b3 = MiscEncrypt.x_b3_traceid_sync()
+    return {"x-s": xs, "x-t": xt, "x-s-common": xsc,
+            "x-b3-traceid": x_b3, "x-xray-traceid": MiscEncrypt.x_xray_traceid_sync(x_b3)}
+
+
+async def run(count: int, rounds: int):
+    payload = "?" + json.dumps(PARAMS, separators=(',', ':'), ensure_ascii=False)
+    xt = str(int(time.time() * 1000))
+
+    expected = await headers_async(payload, xt)
+    actual = headers_sync(payload, xt)
+    for key in ("x-s", "x-t", "x-s-common"):
+        assert expected[key] == actual[key], f"{key} 同步与异步结果不一致"
+
+    async def via_async():
+        for _ in range(count):
+            await headers_async(payload, xt)
+
+    async def via_sync():
+        for _ in range(count):
+            headers_sync(payload, xt)
+
+    results = {}
+    for name, fn in (("async", via_async), ("sync", via_sync)):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await fn()
+            best = min(best, time.perf_counter() - start)
+        results[name] = best / count * 1e6
+        print(f"{name:6}: {results[name]:8.2f} us/请求")
+    print(f"每个请求节省: {results['async'] - results['sync']:.2f} us ({results['async'] / results['sync']:.2f}x)")
+
+
+def main(count: int = 2000, rounds: int = 5):
+    asyncio.run(run(count, rounds))
+
+
+if __name__ == '__main__':
+    main()
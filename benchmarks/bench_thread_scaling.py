@@ -0,0 +1,50 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from xhshow.encrypt import get_signing_identity
+from xhshow.schemas.xsc.redcaptcha import CaptchaXSCV2
+
+A1 = "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995"
+URI = "/api/sns/web/v1/search/notes"
+
+
+def build_jobs(count: int) -> list:
+    return [(URI, f'{{"keyword":"美食","page":{page},"page_size":20,"search_id":"2e6k{page:08d}"}}',
+             str(1732352811091 + page)) for page in range(count)]
+
+
+def sign_chunk(jobs: list) -> list:
+    identity = get_signing_identity(A1, CaptchaXSCV2)
+    return [identity.sign(uri, payload, xt) for uri, payload, xt in jobs]
+
+
+def main(count: int = 4000, thread_counts=(1, 2, 4, 8), rounds: int = 3):
+    jobs = build_jobs(count)
+    expected = sign_chunk(jobs)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"签名数量: {count}, GIL: {'开启' if gil else '关闭'}")
+
+    baseline = None
+    for threads in thread_counts:
+        chunks = [jobs[i::threads] for i in range(threads)]
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(sign_chunk, chunks))
+            # 多线程结果与单线程逐一比对
+            for i, chunk_result in enumerate(results):
+                assert chunk_result == expected[i::threads], "多线程签名结果与单线程不一致"
+
+            best = float('inf')
+            for _ in range(rounds):
+                start = time.perf_counter()
+                list(executor.map(sign_chunk, chunks))
+                best = min(best, time.perf_counter() - start)
+
+        throughput = count / best
+        baseline = baseline or throughput
+        print(f"{threads} 线程: {throughput:10,.0f} 次/秒  扩展比 {throughput / baseline:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
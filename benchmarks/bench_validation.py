@@ -0,0 +1,55 @@
+"""
+对比调试模式(typeguard 运行时类型检查)与快速模式下 encrypt_xs 的耗时
+
+    python -m xhshow.benchmarks.bench_validation
+    XHSHOW_VALIDATE=0 python -m xhshow.benchmarks.bench_validation  # 以快速模式导入
+"""
+import asyncio
+import time
+
+from xhshow import configure
+from xhshow.encrypt import XsEncrypt
+
+A1 = "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995"
+URL = '/api/sns/web/v1/user_posted?{"num":30,"cursor":"","user_id":"5f2b6d0e000000000101d1c1"}'
+TS = "1732352811091"
+
+
+async def _encrypt_xs(count: int):
+    for _ in range(count):
+        await XsEncrypt.encrypt_xs(url=URL, a1=A1, ts=TS)
+
+
+def _best(fn, count: int, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(count)
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def main(count: int = 5000, rounds: int = 5):
+    initial = configure()["validate"]
+    results = {}
+    outputs = {}
+    try:
+        for validate in (True, False):
+            configure(validate=validate)
+            outputs[validate] = XsEncrypt.encrypt_xs_sync(URL, A1, TS)
+            sync_us = _best(lambda n: [XsEncrypt.encrypt_xs_sync(URL, A1, TS) for _ in range(n)], count, rounds)
+            async_us = _best(lambda n: asyncio.run(_encrypt_xs(n)), count, rounds)
+            results[validate] = (sync_us, async_us)
+    finally:
+        configure(validate=initial)
+
+    assert outputs[True] == outputs[False], "两种模式的输出不一致"
+    print(f"{'模式':8}{'encrypt_xs_sync':>18}{'encrypt_xs':>14}")
+    for validate, name in ((True, "debug"), (False, "fast")):
+        sync_us, async_us = results[validate]
+        print(f"{name:10}{sync_us:14.2f} us{async_us:11.2f} us")
+    print(f"快速模式 encrypt_xs 节省: {results[True][1] - results[False][1]:.2f} us/次")
+
+
+if __name__ == '__main__':
+    main()
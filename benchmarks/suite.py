@@ -0,0 +1,241 @@
+"""
+签名相关函数的离线基准测试
+
+- 以各模块 __main__ 示例中的输入作为黄金向量, 优化前后的输出必须逐字节一致
+- 结果写入JSON, 与上一次的结果比较, 超过回归阈值时以非零状态码退出
+"""
+import asyncio
+import json
+import platform
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from xhshow.encrypt import MiscEncrypt, XscEncrypt, XsEncrypt, generate_local_id, generate_web_id
+from xhshow.encrypt.xsc_encrypt import encode_utf8_reference
+from xhshow.encrypt.xsc_encrypt_v2 import XscEncryptV2
+from xhshow.schemas.xsc.redcaptcha import CaptchaXSCV2
+
+GOLDEN_PATH = Path(__file__).with_name('golden.json')
+
+# encrypt/xsc_encrypt.py 与 encrypt/xsc_encrypt_v2.py 中 __main__ 的示例输入
+DEMO_XS = "XYW_eyJzaWduU3ZuIjoiNTYiLCJzaWduVHlwZSI6IngyIiwiYXBwSWQiOiJ4aHMtcGMtd2ViIiwic2lnblZlcnNpb24iOiIxIiwicGF5bG9hZCI6ImMyZmU4Nzc4MmFiY2I2YTYzOTFhOTY0MjAyMGI3ZmFjODQ2YjUyMjZmNDIzMmQ5Mjc5YmI1OTYzNjg5NTBlYzg0MzkyZGU3OTY2Y2JkNWQxMzc3NDgzOWJmZTdhNmRjNzEwNDYzMjgzY2ZlNTc3YTcyYTE5ZDhiZDhkMTY4NTQzMGUxNmEwMDc4ZmNhZWE1MzY1NDY0ZjBkYjhhOThhODQ0MmQ2NTg0ODNlNzA5Y2RhNWZmNTk2ZThkMDQwNDQzMjg1OGEwMWYzMGU5OTE3MDVmYWM2MTM3MDU1MGQ3MTkwYjhkMWJkYjM2NjVmNjJjMzQ4YWI0ZTgwYjE0ZjgxNTRjYjMyZGFiMWJiYTZlNzdjZmJkNjA4MTQ1YmNlODc2NDhkNDllYzM2ZDZlMzU2ZjJlZWY5ODEyYWFlN2EwZmZjZjljOGVkZDkxOWIzODJhYTEwMWE5Y2JjOWMxZDVjNmIyYjY3N2M5YjFiYTVlMDU0ZTQ3YjdiN2RiM2NjZWQyZWJjODY2Y2Y4NmRjYjg5MjFkMzA5OTQxMDI3Y2ZjNGIzIn0="
+DEMO_XSC = {
+    "xs": DEMO_XS,
+    "xt": "1732352811091",
+    "platform": "xhs-pc-web",
+    "a1": "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995",
+    "x1": "3.8.7",
+    "x4": "4.44.1",
+    "b1": CaptchaXSCV2.b1,
+}
+# README 中验证码签名的示例payload
+DEMO_SIGN_PAYLOAD = {
+    "secretId": "000",
+    "verifyType": "102",
+    "verifyUuid": "",
+    "verifyBiz": "461",
+    "sourceSite": "",
+    "captchaVersion": "1.3.0"
+}
+DEMO_URI = "/api/sns/web/v1/user_posted"
+
+# 不同大小的payload 对应常见的GET查询与较大的POST请求体
+PAYLOAD_SIZES = {"small": 64, "medium": 1024, "large": 16384}
+
+
+def make_payload(size: int) -> str:
+    """构造大约size字节的JSON payload 包含中文与emoji"""
+    unit = '{"note_id":"64f1a2b3000000001f03c2d1","title":"周末探店 美食🍜"}'
+    items = ','.join([unit] * max(1, size // len(unit.encode())))
+    return f'{{"items":[{items}]}}'
+
+
+def make_sign_payload(size: int) -> dict:
+    return {**DEMO_SIGN_PAYLOAD, "sourceSite": "https://www.xiaohongshu.com/" + "x" * max(0, size - 128)}
+
+
+def golden_outputs() -> dict:
+    """对黄金向量输入计算当前实现的输出"""
+    a1, xt = DEMO_XSC["a1"], DEMO_XSC["xt"]
+    outputs = {"encrypt_xs": {}, "encrypt_sign": {}}
+    for name, size in PAYLOAD_SIZES.items():
+        outputs["encrypt_xs"][name] = asyncio.run(
+            XsEncrypt.encrypt_xs(url=DEMO_URI + make_payload(size), a1=a1, ts=xt))
+        outputs["encrypt_sign"][name] = asyncio.run(XsEncrypt.encrypt_sign(ts=xt, payload=make_sign_payload(size)))
+    outputs["encrypt_sign"]["demo"] = asyncio.run(XsEncrypt.encrypt_sign(ts=xt, payload=DEMO_SIGN_PAYLOAD))
+
+    xsc_v1 = asyncio.run(XscEncrypt.encrypt_xsc(**DEMO_XSC))
+    outputs["xsc_encrypt"] = asyncio.run(XscEncrypt.b64_encode(xsc_v1))
+    outputs["xsc_encrypt_v2"] = XscEncryptV2.b64_encode(XscEncryptV2.encrypt_xsc(**DEMO_XSC))
+    outputs["web_id"] = generate_web_id("1a2b3c4d5e6f7g8h9i0j1k2l3m4n5o6p7q8r9s0t1u2v3w4x5y6z")
+    return outputs
+
+
+def check_golden() -> list:
+    """
+    校验黄金向量与随机ID的格式
+
+    Returns:
+        不一致项的描述列表 为空表示全部通过
+    """
+    errors = []
+    expected = json.loads(GOLDEN_PATH.read_text(encoding='utf-8'))
+    actual = golden_outputs()
+
+    def compare(path, exp, act):
+        if isinstance(exp, dict):
+            for key in exp:
+                compare(f"{path}.{key}", exp[key], act.get(key))
+        elif exp != act:
+            errors.append(f"{path}: 输出与黄金向量不一致")
+
+    compare("golden", expected, actual)
+
+    errors.extend(check_utf8_equivalence())
+
+    if not re.fullmatch(r'[0-9a-f]{16}', asyncio.run(MiscEncrypt.x_b3_traceid())):
+        errors.append("x_b3_traceid: 格式错误")
+    if not re.fullmatch(r'[0-9A-Z]+', asyncio.run(MiscEncrypt.search_id())):
+        errors.append("search_id: 格式错误")
+    if len(generate_local_id("iOS")) != 52:
+        errors.append("generate_local_id: 长度错误")
+    return errors
+
+
+def random_unicode_text(rng: random.Random, length: int) -> str:
+    """随机生成包含ASCII、JSON特殊字符、中文、emoji以及任意非代理码位的文本"""
+    pools = (
+        lambda: chr(rng.randint(0x20, 0x7e)),
+        lambda: rng.choice('"\\%/?&=+ #\n\t'),
+        lambda: chr(rng.randint(0x4e00, 0x9fff)),
+        lambda: chr(rng.randint(0x1f300, 0x1faff)),
+        lambda: chr(rng.choice((rng.randint(0x80, 0xd7ff), rng.randint(0xe000, 0x10ffff)))),
+    )
+    return ''.join(rng.choice(pools)() for _ in range(length))
+
+
+def check_utf8_equivalence(count: int = 200, seed: int = 0) -> list:
+    """校验 XscEncrypt 的UTF-8字节路径与原来的 quote/解析 实现在随机Unicode输入上完全一致"""
+    rng = random.Random(seed)
+    errors = []
+    for _ in range(count):
+        title = random_unicode_text(rng, rng.randint(0, 64))
+        text = json.dumps({"title": title, "desc": title[::-1]}, separators=(',', ':'), ensure_ascii=False)
+        if list(XscEncrypt.encrypt_encode_utf8_sync(text)) != encode_utf8_reference(text):
+            errors.append(f"encrypt_encode_utf8: 输入 {text!r} 的输出与原实现不一致")
+    return errors
+
+
+def measure(fn, min_time: float = 0.2, repeat: int = 5) -> float:
+    """
+    测量同步函数单次调用耗时
+
+    Returns:
+        多轮中最快一轮的平均单次耗时(微秒)
+    """
+    def timer(number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+
+    return _best_per_call(timer, min_time, repeat)
+
+
+def measure_async(fn, min_time: float = 0.2, repeat: int = 5) -> float:
+    """测量协程函数单次调用耗时 (包含创建协程与await的开销, 不包含启动事件循环的开销)"""
+    async def batch(number: int):
+        for _ in range(number):
+            await fn()
+
+    loop = asyncio.new_event_loop()
+    try:
+        def timer(number: int) -> float:
+            start = time.perf_counter()
+            loop.run_until_complete(batch(number))
+            return time.perf_counter() - start
+
+        return _best_per_call(timer, min_time, repeat)
+    finally:
+        loop.close()
+
+
+def _best_per_call(timer, min_time: float, repeat: int) -> float:
+    # 先把每轮调用次数翻倍到单轮耗时足够长 再取多轮中最快的一轮
+    number = 1
+    while timer(number) < min_time / repeat and number < 1 << 20:
+        number *= 2
+    return min(timer(number) for _ in range(repeat)) / number * 1e6
+
+
+def cases() -> dict:
+    """基准用例 名称 -> (是否为协程函数, 无参调用)"""
+    a1, xt = DEMO_XSC["a1"], DEMO_XSC["xt"]
+    result = {}
+    for name, size in PAYLOAD_SIZES.items():
+        url = DEMO_URI + make_payload(size)
+        sign_payload = make_sign_payload(size)
+        result[f"encrypt_xs[{name}]"] = (True, lambda url=url: XsEncrypt.encrypt_xs(url=url, a1=a1, ts=xt))
+        result[f"encrypt_xs_sync[{name}]"] = (False, lambda url=url: XsEncrypt.encrypt_xs_sync(url, a1, xt))
+        result[f"encrypt_sign[{name}]"] = (True, lambda p=sign_payload: XsEncrypt.encrypt_sign(ts=xt, payload=p))
+
+    for name, b1 in (("no_b1", ""), ("b1", CaptchaXSCV2.b1)):
+        kwargs = {**DEMO_XSC, "b1": b1}
+        result[f"xsc_encrypt[{name}]"] = (True, lambda kw=kwargs: XscEncrypt.encrypt_xsc(**kw))
+        result[f"xsc_encrypt_sync+b64[{name}]"] = (
+            False, lambda kw=kwargs: XscEncrypt.b64_encode_sync(XscEncrypt.encrypt_xsc_sync(**kw)))
+        result[f"xsc_encrypt_v2+b64[{name}]"] = (
+            False, lambda kw=kwargs: XscEncryptV2.b64_encode(XscEncryptV2.encrypt_xsc(**kw)))
+
+    result["x_b3_traceid"] = (True, MiscEncrypt.x_b3_traceid)
+    result["search_id"] = (True, MiscEncrypt.search_id)
+    result["generate_local_id"] = (False, lambda: generate_local_id("iOS"))
+    return result
+
+
+def run(selected: str = None, min_time: float = 0.2) -> dict:
+    """
+    运行基准测试
+
+    Args:
+        selected: 可选 只运行名称中包含该字符串的用例
+        min_time: 每个用例的最短计时时间(秒)
+    Returns:
+        {"meta": {...}, "results": {用例名: 单次耗时微秒}}
+    """
+    results = {}
+    for name, (is_async, fn) in cases().items():
+        if selected and selected not in name:
+            continue
+        results[name] = round((measure_async if is_async else measure)(fn, min_time), 3)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "time": int(time.time()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    与基线结果比较
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 允许的变慢比例 例如0.2表示慢20%以内不算回归
+    Returns:
+        回归项的描述列表
+    """
+    regressions = []
+    for name, cost in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base and cost > base * (1 + threshold):
+            regressions.append(f"{name}: {base:.2f}us -> {cost:.2f}us (+{(cost / base - 1) * 100:.1f}%)")
+    return regressions
@@ -47,8 +47,7 @@ class ProxyProvider:
             back_fun=True,
             auto_sign=False
         )
-        content = await response.acontent()
-        proxy_list = content.decode().strip().split("\n")
+        proxy_list = response.content.decode().strip().split("\n")
         return proxy_list
 
 
@@ -110,7 +109,7 @@ class CaptchaService:
         }
 
         ts = str(int(time.time() * 1000))
-        headers['x-s'] = await XsEncrypt.encrypt_sign(
+        headers['x-s'] = XsEncrypt.encrypt_sign_sync(
             ts=ts,
             payload=payload
         )
@@ -1,6 +1,8 @@
 from .misc_encrypt import MiscEncrypt
 from .xs_encrypt import XsEncrypt
-from .xsc_encrypt import XscEncrypt
-from .generate_local_id import generate_local_id, generate_web_id
+from .xsc_encrypt import XscEncrypt, SigningIdentity, get_signing_identity
+from .signing_pool import SigningPool
+from .generate_local_id import IdentityFactory, generate_local_id, generate_web_id
+from .validation import configure, is_validating
 
-__all__ = ['XsEncrypt', 'MiscEncrypt', 'XscEncrypt', 'generate_local_id', 'generate_web_id']
+__all__ = ['XsEncrypt', 'MiscEncrypt', 'XscEncrypt', 'SigningIdentity', 'get_signing_identity', 'SigningPool', 'IdentityFactory', 'generate_local_id', 'generate_web_id', 'configure', 'is_validating']
@@ -0,0 +1,44 @@
+import base64
+
+from ..config import lookup, xn, xn64
+
+STANDARD_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+
+def make_table(alphabet: str, pad: str = '=') -> bytes:
+    """
+    生成把标准Base64输出映射到自定义字符表的 bytes.translate 转换表
+
+    Args:
+        alphabet: 64个字符的自定义字符表
+        pad: 填充字符
+    Returns:
+        256字节的转换表
+    """
+    if len(alphabet) != 64 or len(pad) != 1:
+        raise ValueError("Base64字符表必须为64个字符 填充字符必须为1个字符")
+    return bytes.maketrans(STANDARD_ALPHABET + b'=', (alphabet + pad).encode('ascii'))
+
+
+# XscEncrypt / CustomFieldDecrypt 使用的字符表
+LOOKUP_TABLE = make_table(''.join(lookup))
+# XsEncrypt.encrypt_sign 使用的字符表 xn 本身包含 "=" 填充字符为 xn[64]
+XN_TABLE = make_table(xn[:64], xn64)
+
+
+def b64encode(data, table: bytes = None) -> str:
+    """
+    使用自定义字符表进行Base64编码 由 base64.b64encode 完成编码后一次性转换字符表
+
+    Args:
+        data: bytes/bytearray/memoryview 或 0~255 的整数列表
+        table: make_table 生成的转换表 为 None 时使用标准字符表
+    Returns:
+        Base64字符串
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data)
+    encoded = base64.b64encode(data)
+    if table is not None:
+        encoded = encoded.translate(table)
+    return encoded.decode('ascii')
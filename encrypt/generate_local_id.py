@@ -1,12 +1,16 @@
 # 测试 generateLocalId 函数
 # 提取相关代码并运行
 
-import random
+import json
+import os
+import sqlite3
 import time
 import zlib
 import hashlib
 from enum import IntEnum
 
+from .thread_local import get_random
+
 # 常量定义
 CHARSET = "abcdefghijklmnopqrstuvwxyz1234567890"
 LOCAL_ID_SECRET_VERSION = "0"
@@ -22,7 +26,8 @@ class PlatformCode(IntEnum):
 
 # 生成随机字符串函数
 def gen_random_string(length):
-    return ''.join(random.choice(CHARSET) for _ in range(length))
+    rng = get_random()
+    return ''.join(rng.choice(CHARSET) for _ in range(length))
 
 # 获取平台代码函数
 def get_platform_code(platform):
@@ -78,6 +83,118 @@ def generate_id_pair(platform):
     web_id = generate_web_id(local_id)
     return local_id, web_id
 
+# 36 * 7 = 252 之后的字节会导致取模偏差 直接丢弃
+_CHARSET_ACCEPT = len(CHARSET) * (256 // len(CHARSET))
+_CHARSET_TABLE = bytes(ord(CHARSET[i % len(CHARSET)]) if i < _CHARSET_ACCEPT else 0 for i in range(256))
+_CHARSET_REJECT = bytes(range(_CHARSET_ACCEPT, 256))
+
+
+class IdentityFactory:
+    """
+    批量生成设备身份 (a1/localId, webId)
+
+    随机部分一次性从 os.urandom 取一整块字节, 通过 bytes.translate 映射到 CHARSET:
+    0~251 映射为 CHARSET[b % 36], 252~255 直接删除以保证均匀分布; CRC32/MD5 在局部变量绑定的循环中计算。
+    a1 与 localId 格式相同, CookieFieldEncrypt.get_a1_and_web_id 即平台为 other 时的结果
+
+    Args:
+        chunk_size: 流式写入文件时每批生成的数量
+    """
+
+    RANDOM_LENGTH = 30
+
+    def __init__(self, chunk_size: int = 100000):
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def random_strings(cls, n: int, length: int = RANDOM_LENGTH) -> bytes:
+        """
+        一次性生成 n 个长度为 length 的随机字符串 首尾相连
+
+        Args:
+            n: 数量
+            length: 单个字符串长度
+        Returns:
+            长度为 n * length 的 bytes
+        """
+        need = n * length
+        chunks = []
+        size = 0
+        while size < need:
+            # 约 1.6% 的字节会被丢弃 多取一些避免再次读取
+            block = os.urandom((need - size) * 66 // 64 + 16).translate(_CHARSET_TABLE, _CHARSET_REJECT)
+            chunks.append(block)
+            size += len(block)
+        return b''.join(chunks)[:need]
+
+    def generate(self, n: int, platform: str = "other", timestamp: int = None) -> list:
+        """
+        批量生成设备身份
+
+        Args:
+            n: 数量
+            platform: 平台 见 get_platform_code
+            timestamp: 毫秒时间戳 默认为当前时间 同一批次共用
+        Returns:
+            [(local_id, web_id), ...] local_id 即 Cookies 中的 a1
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        prefix = hex(timestamp)[2:].encode()
+        suffix = (str(int(get_platform_code(platform))) + LOCAL_ID_SECRET_VERSION + "000").encode()
+        length = self.RANDOM_LENGTH
+        randoms = self.random_strings(n, length)
+        crc = zlib.crc32
+        md5 = hashlib.md5
+
+        result = []
+        for offset in range(0, n * length, length):
+            base = prefix + randoms[offset:offset + length] + suffix
+            local_id = (base + b'%d' % crc(base))[:52]
+            result.append((local_id.decode(), md5(local_id).hexdigest()))
+        return result
+
+    def iter_chunks(self, n: int, platform: str = "other"):
+        """按 chunk_size 分批生成 每批使用当时的时间戳"""
+        remaining = n
+        while remaining > 0:
+            count = min(self.chunk_size, remaining)
+            yield self.generate(count, platform)
+            remaining -= count
+
+    def write_jsonl(self, path: str, n: int, platform: str = "other") -> int:
+        """
+        生成身份并追加写入JSONL文件 每行 {"a1": ..., "web_id": ...}
+
+        Returns:
+            写入的数量
+        """
+        written = 0
+        with open(path, 'a', encoding='utf-8') as file:
+            for chunk in self.iter_chunks(n, platform):
+                file.write(''.join(json.dumps({"a1": a1, "web_id": web_id}) + "\n" for a1, web_id in chunk))
+                written += len(chunk)
+        return written
+
+    def write_sqlite(self, path: str, n: int, platform: str = "other", table: str = "identities") -> int:
+        """
+        生成身份并写入SQLite身份池 表结构为 (a1 TEXT PRIMARY KEY, web_id TEXT, platform TEXT)
+
+        Returns:
+            写入的数量
+        """
+        if not table.isidentifier():
+            raise ValueError(f"非法的表名: {table}")
+        written = 0
+        with sqlite3.connect(path) as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (a1 TEXT PRIMARY KEY, web_id TEXT, platform TEXT)")
+            for chunk in self.iter_chunks(n, platform):
+                conn.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?, ?, ?)",
+                                 ((a1, web_id, platform) for a1, web_id in chunk))
+                written += len(chunk)
+        return written
+
+
 if __name__ == "__main__":
     # 测试函数
     print("测试 generateLocalId 和 webId 生成:")
@@ -0,0 +1,75 @@
+import zlib
+
+from ..config import ie
+
+# mrc 的最终异或常量
+MRC_XOR = 3988292384
+
+
+def to_js_int(num: int) -> int:
+    """将整数截断为JavaScript中的32位有符号整数"""
+    return (num + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+
+def mrc_reference(e: str) -> int:
+    """
+    使用自定义CRC算法生成校验值 逐字符查表的参考实现 与JavaScript版本逐步对应
+    Args:
+        e: 输入字符串
+    Returns:
+        32位整数校验值
+    """
+    o = -1
+
+    def unsigned_right_shift(r, n=8):
+        return (r + (1 << 32)) >> n & 0xFFFFFFFF if r < 0 else (r >> n) & 0xFFFFFFFF
+
+    for char in e:
+        o = to_js_int(ie[(o & 255) ^ ord(char)] ^ unsigned_right_shift(o, 8))
+    return to_js_int(~o ^ MRC_XOR)
+
+
+def mrc_zlib(e: str) -> int:
+    """
+    mrc 的 zlib 实现
+
+    ie 即标准CRC32表 初始值 -1 与 zlib 相同, 循环结束后的 ~o 正好是 zlib.crc32 的返回值,
+    因此只需再异或 MRC_XOR。参考实现按 ord(char) 查表, 对应 latin-1 编码后的字节;
+    含有码位大于255的字符时参考实现会越界, 这里交给参考实现以保持相同的异常
+    Args:
+        e: 输入字符串
+    Returns:
+        32位整数校验值
+    """
+    try:
+        data = e.encode('latin-1')
+    except UnicodeEncodeError:
+        return mrc_reference(e)
+    return to_js_int(zlib.crc32(data) ^ MRC_XOR)
+
+
+def _self_check() -> bool:
+    """导入时校验 zlib 实现与参考实现逐位一致 ie 表被修改时自动退回参考实现"""
+    samples = ('', 'a', '1732352811091XYW_eyJzaWduU3ZuIjoiNTYi', ''.join(map(chr, range(256))))
+    return all(mrc_zlib(sample) == mrc_reference(sample) for sample in samples)
+
+
+mrc = mrc_zlib if _self_check() else mrc_reference
+
+
+def mrc_concat(prefix: str, suffix: bytes) -> int:
+    """
+    计算 mrc(prefix + suffix) 其中 suffix 是预先按 latin-1 编码好的固定尾部
+    zlib 实现可以直接在 prefix 的CRC状态上继续计算 suffix, 省去每次拼接与编码长尾部
+    Args:
+        prefix: 每次变化的前缀
+        suffix: 固定尾部的 latin-1 字节
+    Returns:
+        32位整数校验值
+    """
+    if mrc is mrc_zlib:
+        try:
+            return to_js_int(zlib.crc32(suffix, zlib.crc32(prefix.encode('latin-1'))) ^ MRC_XOR)
+        except UnicodeEncodeError:
+            pass
+    return mrc(prefix + suffix.decode('latin-1'))
@@ -0,0 +1,156 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .xs_encrypt import XsEncrypt
+
+
+def _run_job(kind: str, args: tuple):
+    match kind:
+        case 'sign':
+            identity, uri, payload, xt = args
+            return identity.sign(uri, payload, xt)
+        case 'encrypt_sign':
+            return XsEncrypt.encrypt_sign_sync(*args)
+        case _:
+            raise ValueError(f"未知的签名任务类型: {kind}")
+
+
+def run_batch(jobs: list) -> list:
+    """
+    在工作进程中执行一批签名任务
+
+    Args:
+        jobs: (kind, args) 组成的列表
+    Returns:
+        与jobs一一对应的 (是否成功, 结果或异常) 列表
+    """
+    results = []
+    for kind, args in jobs:
+        try:
+            results.append((True, _run_job(kind, args)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class SigningPool:
+    """
+    多进程签名服务
+
+    事件循环中的签名请求先进入队列, 攒够 batch_size 个或等待超过 max_delay 秒后
+    整批交给进程池执行, 事件循环只负责等待结果, 从而让签名的CPU开销分摊到多个核心
+
+    Args:
+        max_workers: 工作进程数量 默认为CPU核心数
+        batch_size: 单批最多任务数
+        max_delay: 任务在队列中等待凑批的最长时间(秒)
+        executor: 可选 自定义执行器 传入时由调用方负责关闭
+    """
+
+    def __init__(self, max_workers: int = None, batch_size: int = 32, max_delay: float = 0.002,
+                 executor: Executor = None):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._own_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+        self._pending = []
+        self._timer = None
+
+    @classmethod
+    def threaded(cls, max_workers: int = None, batch_size: int = 1, max_delay: float = 0.0) -> 'SigningPool':
+        """
+        使用线程池执行签名的适配器
+
+        签名状态按线程隔离 (见 thread_local), 不需要序列化参数; pycryptodome / hashlib / zlib
+        在计算时会释放GIL, free-threaded CPython 下可以完全并行
+
+        Args:
+            max_workers: 线程数量
+            batch_size: 单批最多任务数 线程池没有序列化开销 默认不凑批
+            max_delay: 任务在队列中等待凑批的最长时间(秒)
+        Returns:
+            SigningPool
+        """
+        pool = cls(batch_size=batch_size, max_delay=max_delay,
+                   executor=ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='xhshow-sign'))
+        pool._own_executor = True
+        return pool
+
+    async def sign(self, identity, uri: str, payload, xt) -> tuple:
+        """
+        生成一次请求的全部签名请求头 见 SigningIdentity.sign
+
+        Args:
+            identity: 签名身份
+            uri: API的uri
+            payload: 参与签名的参数部分
+            xt: 时间戳
+        Returns:
+            (x-s, x-t, x-s-common)
+        """
+        return await self._submit('sign', (identity, uri, payload, str(xt)))
+
+    async def encrypt_sign(self, ts: str, payload: dict) -> str:
+        """
+        验证码签名 见 XsEncrypt.encrypt_sign
+
+        Args:
+            ts: xt
+            payload: 请求参数
+        Returns:
+            加密后的字符串
+        """
+        return await self._submit('encrypt_sign', (ts, payload))
+
+    def _submit(self, kind: str, args: tuple) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((kind, args, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        jobs = [(kind, args) for kind, args, _ in batch]
+        futures = [future for _, _, future in batch]
+        task = asyncio.get_running_loop().run_in_executor(self._executor, run_batch, jobs)
+        task.add_done_callback(lambda done: self._resolve(done, futures))
+
+    @staticmethod
+    def _resolve(done: asyncio.Future, futures: list):
+        if done.cancelled() or done.exception() is not None:
+            error = asyncio.CancelledError() if done.cancelled() else done.exception()
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for future, (ok, value) in zip(futures, done.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def close(self):
+        """提交剩余任务并关闭进程池"""
+        self._flush()
+        if self._own_executor:
+            await asyncio.to_thread(self._executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
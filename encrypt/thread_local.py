@@ -0,0 +1,34 @@
+"""
+签名过程中需要按线程隔离的状态
+
+加密器链值、随机数生成器等可变对象都按线程各持一份, 多线程(包括 free-threaded CPython)
+同时签名时不需要加锁, 也不需要像进程池那样序列化参数
+"""
+import os
+import random
+import threading
+
+_local = threading.local()
+
+
+def get_random() -> random.Random:
+    """
+    返回当前线程独享的随机数生成器 首次使用时以 os.urandom 播种
+
+    Returns:
+        random.Random 实例
+    """
+    rng = getattr(_local, 'random', None)
+    if rng is None:
+        rng = _local.random = random.Random(os.urandom(16))
+    return rng
+
+
+def _reset_after_fork():
+    # fork 出的子进程会继承父进程的随机数状态 需要重新播种 避免各进程生成相同的ID
+    global _local
+    _local = threading.local()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,92 @@
+import os
+import sys
+
+from typeguard import typechecked as _typechecked
+
+# 设置为 0/false/no/off 时以快速模式导入 签名函数不做运行时类型检查
+VALIDATE_ENV = "XHSHOW_VALIDATE"
+
+
+def _validate_from_env() -> bool:
+    return os.environ.get(VALIDATE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class _Checked:
+    """记录一个被 @typechecked 修饰的函数 原始函数与插桩后的函数各保存一份"""
+
+    __slots__ = ('raw', 'checked')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.checked = None
+
+    def get(self, validate: bool):
+        if not validate:
+            return self.raw
+        if self.checked is None:
+            self.checked = _typechecked(self.raw)
+        return self.checked
+
+
+_validate = _validate_from_env()
+_registry: list = []
+
+
+def typechecked(func):
+    """
+    替代 typeguard.typechecked 的装饰器
+
+    调试模式(默认)下返回插桩后的函数 与直接使用 typeguard 完全一致;
+    快速模式下返回原函数本身 调用时没有任何额外开销。
+    所有被修饰的函数都会登记 configure 切换模式时统一重新绑定
+
+    Args:
+        func: 需要类型检查的函数 需直接定义在模块或类中
+    Returns:
+        当前模式下应绑定的函数
+    """
+    entry = _Checked(func)
+    _registry.append(entry)
+    return entry.get(_validate)
+
+
+def _rebind(entry: _Checked, validate: bool):
+    """按 __module__ 与 __qualname__ 找到函数所在的类或模块 替换为对应模式的函数"""
+    owner = sys.modules.get(entry.raw.__module__)
+    *path, name = entry.raw.__qualname__.split('.')
+    for attr in path:
+        owner = getattr(owner, attr, None)
+        if owner is None:
+            return
+    target = entry.get(validate)
+    current = vars(owner).get(name)
+    if isinstance(current, staticmethod):
+        target = staticmethod(target)
+    elif isinstance(current, classmethod):
+        target = classmethod(target)
+    setattr(owner, name, target)
+
+
+def configure(validate: bool = None) -> dict:
+    """
+    全局配置
+
+    Args:
+        validate: True 为调试模式 对所有 @typechecked 函数做运行时类型检查;
+            False 为快速模式 直接调用原函数。None 表示不修改。
+            导入时的默认值由环境变量 XHSHOW_VALIDATE 决定
+            同时作用于 encrypt_*_sync 与请求签名路径(SigningIdentity.sign、XsEncrypt.sign_many 等)
+    Returns:
+        当前配置
+    """
+    global _validate
+    if validate is not None and bool(validate) != _validate:
+        _validate = bool(validate)
+        for entry in _registry:
+            _rebind(entry, _validate)
+    return {"validate": _validate}
+
+
+def is_validating() -> bool:
+    """当前是否处于调试模式(运行时类型检查)"""
+    return _validate
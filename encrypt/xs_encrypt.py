@@ -1,36 +1,141 @@
 import base64
 import hashlib
-import itertools
 import json
 import struct
+import threading
+from functools import lru_cache
 
 from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad
-from typeguard import typechecked
 
-from ..config import xn, xn64
+from .b64 import XN_TABLE, b64encode
+from .validation import typechecked
+
+
+class CbcEncryptor:
+    """
+    复用同一份AES密钥扩展的CBC加密器
+
+    pycryptodome的CBC对象在加密后会把最后一个密文块作为下一次的链值, 无法重置IV,
+    因此每次都要 AES.new 重新做一遍密钥扩展。这里只创建一次CBC对象, 每次加密前把首块
+    与 iv ^ 上一次的末尾密文块 异或, 使结果与使用固定iv新建的加密器完全一致
+
+    CBC对象与链值按线程各保存一份, 可以在多个线程中同时使用
+    """
+
+    def __init__(self, key: bytes, iv: bytes):
+        self._key = key
+        self._iv_bytes = iv
+        self._iv = int.from_bytes(iv, 'big')
+        self._local = threading.local()
+
+    def encrypt(self, data) -> bytes:
+        """
+        使用固定iv对已填充的数据进行CBC加密
+
+        Args:
+            data: 长度为16整数倍的bytes或memoryview
+        Returns:
+            密文
+        """
+        local = self._local
+        cipher = getattr(local, 'cipher', None)
+        if cipher is None:
+            cipher = local.cipher = AES.new(self._key, AES.MODE_CBC, self._iv_bytes)
+            local.chain = 0
+
+        data = memoryview(data)
+        head = (int.from_bytes(data[:16], 'big') ^ local.chain).to_bytes(16, 'big')
+        ciphertext = cipher.encrypt(head + data[16:])
+        local.chain = int.from_bytes(ciphertext[-16:], 'big') ^ self._iv
+        return ciphertext
+
+
+@lru_cache(maxsize=32)
+def _envelope_prefix(platform: str) -> str:
+    """x-s 外层JSON中payload之前的固定部分 与 json.dumps(separators=(',', ':')) 的输出一致"""
+    return f'{{"signSvn":"56","signType":"x2","appID":{json.dumps(platform)},"signVersion":"1","payload":"'
+
+
+def serialize_payload(payload) -> str:
+    """
+    将签名用的payload部分转为字符串 与 AsyncRequestFramework 中签名时的序列化方式一致
+
+    Args:
+        payload: 已序列化的字符串(GET为 "?" + 参数JSON, POST为请求体JSON) 或 UTF-8 编码的 bytes
+            或 dict/list 或 None
+    Returns:
+        拼接在uri之后参与签名的字符串 传入bytes时原样返回
+    """
+    if payload is None:
+        return ''
+    if isinstance(payload, (str, bytes)):
+        return payload
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
 
 
 class XsEncrypt:
     words = [929260340, 1633971297, 895580464, 925905270]
     key_bytes = b''.join(struct.pack('>I', word) for word in words)
     iv = b'4uzjr7mbsibcaldp'
+    x2 = 'x2=0|0|0|1|0|0|1|0|0|0|1|0|0|0|0|1|0|0|0;'
+    cbc = CbcEncryptor(key_bytes, iv)
 
     @staticmethod
-    async def encrypt_md5(url: str) -> str:
+    def encrypt_md5_sync(url: str) -> str:
         """
         根据传入的url和params生成MD5摘要
+
+        Args:
+            url: API的url
+        Returns:
+            MD5摘要
+        """
+        return hashlib.md5(url.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    async def encrypt_md5(url: str) -> str:
+        """
+        根据传入的url和params生成MD5摘要 异步兼容接口 见 encrypt_md5_sync
         
         Args:
             url: API的url
         Returns:
             MD5摘要
         """
-        md5_hash = hashlib.md5(url.encode('utf-8')).hexdigest()
-        return md5_hash
+        return XsEncrypt.encrypt_md5_sync(url)
 
     @staticmethod
-    async def encrypt_text(text: str) -> str:
+    def encrypt_x1(uri: str, payload=None) -> str:
+        """
+        计算xs中的x1 即 md5("url=" + uri + payload)
+
+        Args:
+            uri: API的uri
+            payload: 参与签名的参数部分 见 serialize_payload
+        Returns:
+            MD5摘要
+        """
+        tail = serialize_payload(payload)
+        if isinstance(tail, bytes):
+            return hashlib.md5(f'url={uri}'.encode() + tail).hexdigest()
+        return hashlib.md5(f'url={uri}{tail}'.encode()).hexdigest()
+
+    @staticmethod
+    def encrypt_bytes(text: bytes) -> bytes:
+        """
+        同步版本: 对text做base64编码后进行AES-CBC加密 全程只处理bytes
+
+        Args:
+            text: 需要加密的内容
+        Returns:
+            AES加密后的原始密文
+        """
+        text_encoded = base64.b64encode(text)
+        padding = AES.block_size - len(text_encoded) % AES.block_size
+        return XsEncrypt.cbc.encrypt(text_encoded + bytes((padding,)) * padding)
+
+    @staticmethod
+    def encrypt_text_sync(text: str) -> str:
         """
         根据传入的text生成AES加密后的内容，并将其转为base64编码
 
@@ -39,31 +144,61 @@ class XsEncrypt:
         Returns:
             加密后的base64编码字符串
         """
-        text_encoded = base64.b64encode(text.encode())
+        return base64.b64encode(XsEncrypt.encrypt_bytes(text.encode())).decode()
+
+    @staticmethod
+    async def encrypt_text(text: str) -> str:
+        """
+        根据传入的text生成AES加密后的内容，并将其转为base64编码 异步兼容接口 见 encrypt_text_sync
+
+        Args:
+            text: 需要加密的字符串
+        Returns:
+            加密后的base64编码字符串
+        """
+        return XsEncrypt.encrypt_text_sync(text)
+
+    @staticmethod
+    def base64_to_hex_sync(encoded_data):
+        """
+        把加密后的payload转为16进制
 
-        cipher = AES.new(XsEncrypt.key_bytes, AES.MODE_CBC, XsEncrypt.iv)
-        ciphertext = cipher.encrypt(pad(text_encoded, AES.block_size))
-        ciphertext_base64 = base64.b64encode(ciphertext).decode()
+        Args:
+            encoded_data: 加密后的payload
+        Returns:
 
-        return ciphertext_base64
+        """
+        return base64.b64decode(encoded_data).hex()
 
     @staticmethod
     async def base64_to_hex(encoded_data):
         """
-        把加密后的payload转为16进制
+        把加密后的payload转为16进制 异步兼容接口 见 base64_to_hex_sync
 
         Args:
             encoded_data: 加密后的payload
         Returns:
 
         """
-        decoded_data = base64.b64decode(encoded_data)
-        hex_string = ''.join([format(byte, '02x') for byte in decoded_data])
-        return hex_string
+        return XsEncrypt.base64_to_hex_sync(encoded_data)
+
+    @staticmethod
+    def encrypt_payload_bytes(ciphertext: bytes, platform: str) -> str:
+        """
+        同步版本: 把AES密文转16进制后包装进x-s的JSON外层 再使用base64编码
+
+        Args:
+            ciphertext: AES加密后的原始密文
+            platform: 登录平台
+        Returns:
+            加密后并进行base64编码的字符串
+        """
+        envelope = f'{_envelope_prefix(platform)}{ciphertext.hex()}"}}'
+        return base64.b64encode(envelope.encode()).decode()
 
     @staticmethod
     @typechecked
-    async def encrypt_payload(payload: str, platform: str) -> str:
+    def encrypt_payload_sync(payload: str, platform: str) -> str:
         """
         把小红书加密参数payload转16进制 再使用base64编码
 
@@ -73,20 +208,84 @@ class XsEncrypt:
         Returns:
             加密后并进行base64编码的字符串
         """
-        obj = {
-            "signSvn": "56",
-            "signType": "x2",
-            "appID": platform,
-            "signVersion": "1",
-            "payload": await XsEncrypt.base64_to_hex(payload)
-        }
-        return base64.b64encode(json.dumps(obj, separators=(',', ':')).encode()).decode()
+        return XsEncrypt.encrypt_payload_bytes(base64.b64decode(payload), platform)
+
+    @staticmethod
+    async def encrypt_payload(payload: str, platform: str) -> str:
+        """
+        把小红书加密参数payload转16进制 再使用base64编码 异步兼容接口 见 encrypt_payload_sync
+
+        Args:
+            payload: 要加密处理的payload内容
+            platform: 登录平台
+        Returns:
+            加密后并进行base64编码的字符串
+        """
+        return XsEncrypt.encrypt_payload_sync(payload, platform)
+
+    @staticmethod
+    @typechecked
+    def encrypt_xs_sync(url: str, a1: str, ts: str, platform: str = 'xhs-pc-web') -> str:
+        """
+        同步版本的encrypt_xs 从md5到最终base64只做一次编码 中间只传递bytes
+
+        Args: url: API请求的URL
+            a1: 签名参数a1
+            ts: 时间戳
+            platform: 登录平台 默认为xhs-pc-web
+        Returns:
+            最终的加密签名字符串，前缀为“XYW_”
+        """
+        x1 = hashlib.md5(f'url={url}'.encode()).hexdigest()
+        text = f'x1={x1};{XsEncrypt.x2}x3={a1};x4={ts};'.encode()
+        return 'XYW_' + XsEncrypt.encrypt_payload_bytes(XsEncrypt.encrypt_bytes(text), platform)
 
     @staticmethod
     @typechecked
+    def sign(uri: str, payload, a1: str, ts: str, platform: str = 'xhs-pc-web') -> str:
+        """
+        按 uri 与 payload 分开传入的方式生成xs 结果与 encrypt_xs_sync(uri + payload, ...) 一致
+
+        Args:
+            uri: API的uri
+            payload: 参与签名的参数部分 见 serialize_payload
+            a1: 签名参数a1
+            ts: 时间戳
+            platform: 登录平台 默认为xhs-pc-web
+        Returns:
+            最终的加密签名字符串，前缀为“XYW_”
+        """
+        return XsEncrypt.sign_many(((uri, payload, a1, ts),), platform)[0]
+
+    @staticmethod
+    @typechecked
+    def sign_many(requests, platform: str = 'xhs-pc-web') -> list:
+        """
+        批量生成xs 循环外只计算一次x2模板与JSON外层前缀
+
+        Args:
+            requests: (uri, payload, a1, ts) 元组组成的列表 payload 见 serialize_payload
+            platform: 登录平台 默认为xhs-pc-web
+        Returns:
+            与requests一一对应的xs列表
+        """
+        prefix = _envelope_prefix(platform)
+        x2 = XsEncrypt.x2
+        encrypt_x1 = XsEncrypt.encrypt_x1
+        b64encode = base64.b64encode
+        encrypt_bytes = XsEncrypt.encrypt_bytes
+
+        result = []
+        for uri, payload, a1, ts in requests:
+            x1 = encrypt_x1(uri, payload)
+            ciphertext = encrypt_bytes(f'x1={x1};{x2}x3={a1};x4={ts};'.encode())
+            result.append('XYW_' + b64encode(f'{prefix}{ciphertext.hex()}"}}'.encode()).decode())
+        return result
+
+    @staticmethod
     async def encrypt_xs(url: str, a1: str, ts: str, platform: str = 'xhs-pc-web') -> str:
         """
-        将传入的参数加密为小红书的xs
+        将传入的参数加密为小红书的xs 异步兼容接口 见 encrypt_xs_sync
 
         Args: url: API请求的URL
             a1: 签名参数a1
@@ -95,17 +294,13 @@ class XsEncrypt:
         Returns:
             最终的加密签名字符串，前缀为“XYW_”
         """
-        text = (f'x1={await XsEncrypt.encrypt_md5(url="url="+url)};'
-                f'x2=0|0|0|1|0|0|1|0|0|0|1|0|0|0|0|1|0|0|0;'
-                f'x3={a1};'
-                f'x4={ts};')
-        return 'XYW_' + await XsEncrypt.encrypt_payload(await XsEncrypt.encrypt_text(text), platform=platform)
+        return XsEncrypt.encrypt_xs_sync(url, a1, ts, platform)
 
     @staticmethod
     @typechecked
-    async def encrypt_sign(ts: str, payload: dict) -> str:
+    def encrypt_sign_sync(ts: str, payload: dict) -> str:
         """
-        小红书验证码签名
+        同步版本的小红书验证码签名
         Args:
             ts: xt
             payload: 请求参数
@@ -114,15 +309,16 @@ class XsEncrypt:
         """
         url = f"{ts}test/api/redcaptcha/v2/captcha/register{json.dumps(payload, separators=(',', ':'), ensure_ascii=False)}"
 
-        result = ''
-        md5_ascii = [ord(char) for char in await XsEncrypt.encrypt_md5(url)]
-        chunks = itertools.zip_longest(md5_ascii[::3], md5_ascii[1::3], md5_ascii[2::3], fillvalue=0)
-
-        for u, c, s in chunks:
-            l = u >> 2
-            f = ((u & 3) << 4) | (c >> 4)
-            p = ((c & 15) << 2) | (s >> 6) if c else 64
-            d = s & 63 if s else 64
+        return b64encode(hashlib.md5(url.encode('utf-8')).hexdigest().encode(), XN_TABLE)
 
-            result += xn[l] + xn[f] + (xn[p] if p < 64 else xn64) + (xn[d] if d < 64 else xn64)
-        return result
+    @staticmethod
+    async def encrypt_sign(ts: str, payload: dict) -> str:
+        """
+        小红书验证码签名 异步兼容接口 见 encrypt_sign_sync
+        Args:
+            ts: xt
+            payload: 请求参数
+        Returns:
+            加密后的字符串
+        """
+        return XsEncrypt.encrypt_sign_sync(ts, payload)
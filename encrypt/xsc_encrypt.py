@@ -1,8 +1,13 @@
 import json
 import random
 import urllib.parse
+from functools import lru_cache
 
-from ..config import ie, lookup
+from ..config import lookup
+from .b64 import LOOKUP_TABLE, b64encode
+from .mrc import mrc, mrc_concat
+from .validation import typechecked
+from .xs_encrypt import XsEncrypt
 
 
 class XscEncrypt:
@@ -19,27 +24,22 @@ class XscEncrypt:
         Returns:
             编码后的整数列表
         """
-        encoded = urllib.parse.quote(text)
-        result = []
-        i = 0
-        
-        while i < len(encoded):
-            char = encoded[i]
-            if char == '%':
-                # 获取%后面的两个字符并转换为16进制整数
-                hex_chars = encoded[i + 1:i + 3]
-                ascii_value = int(hex_chars, 16)
-                result.append(ascii_value)
-                i += 3  # 跳过 '%' 和后面的两个十六进制字符
-            else:
-                # 直接获取字符的ASCII码
-                result.append(ord(char))
-                i += 1
-        
-        return result
+        return list(XscEncrypt.encrypt_encode_utf8_sync(text))
 
     @staticmethod
-    async def triplet_to_base64(e) -> str:
+    def encrypt_encode_utf8_sync(text) -> bytes:
+        """
+        同步版本的encrypt_encode_utf8
+        URL编码后再把 %XX 还原为字节值 结果与UTF-8编码完全相同 见 encode_utf8_reference
+        Args:
+            text: 需要编码的字符串
+        Returns:
+            UTF-8字节 按下标取值即为原来的整数列表
+        """
+        return text.encode('utf-8')
+
+    @staticmethod
+    def triplet_to_base64_sync(e) -> str:
         """
         将24位整数分成4个6位部分 转换为Base64字符串
         Args:
@@ -51,7 +51,18 @@ class XscEncrypt:
                 lookup[(e >> 6) & 63] + lookup[e & 63])
 
     @staticmethod
-    async def encode_chunk(e, t, r) -> str:
+    async def triplet_to_base64(e) -> str:
+        """
+        将24位整数分成4个6位部分 转换为Base64字符串 异步兼容接口 见 triplet_to_base64_sync
+        Args:
+            e: 需要转换的整数
+        Returns:
+            Base64字符串
+        """
+        return XscEncrypt.triplet_to_base64_sync(e)
+
+    @staticmethod
+    def encode_chunk_sync(e, t, r) -> str:
         """
         将编码后的整数列表分成3字节一组转换为Base64
         Args:
@@ -65,10 +76,22 @@ class XscEncrypt:
         for b in range(t, r, 3):
             if b + 2 < len(e):  # 确保有完整的三个字节
                 triplet = (e[b] << 16) + (e[b + 1] << 8) + e[b + 2]
-                chunk = await XscEncrypt.triplet_to_base64(triplet)
-                chunks.append(chunk)
+                chunks.append(XscEncrypt.triplet_to_base64_sync(triplet))
         return ''.join(chunks)
 
+    @staticmethod
+    async def encode_chunk(e, t, r) -> str:
+        """
+        将编码后的整数列表分成3字节一组转换为Base64 异步兼容接口 见 encode_chunk_sync
+        Args:
+            e: 整数列表
+            t: 开始位置
+            r: 结束位置
+        Returns:
+            编码后的Base64字符串
+        """
+        return XscEncrypt.encode_chunk_sync(e, t, r)
+
     @staticmethod
     async def b64_encode(e) -> str:
         """
@@ -78,18 +101,18 @@ class XscEncrypt:
         Returns:
             Base64字符串
         """
-        P = len(e)
-        W = P % 3
-        Z = P - W
-        result = [await XscEncrypt.encode_chunk(e, i, min(i + 16383, Z)) for i in range(0, Z, 16383)]
+        return XscEncrypt.b64_encode_sync(e)
 
-        if W == 1:
-            F = e[-1]
-            result.append(lookup[F >> 2] + lookup[(F << 4) & 63] + "==")
-        elif W == 2:
-            F = (e[-2] << 8) + e[-1]
-            result.append(lookup[F >> 10] + lookup[(F >> 4) & 63] + lookup[(F << 2) & 63] + "=")
-        return "".join(result)
+    @staticmethod
+    def b64_encode_sync(e) -> str:
+        """
+        同步版本的b64_encode 使用 lookup 字符表的转换表一次完成编码
+        Args:
+            e: bytes 或整数列表
+        Returns:
+            Base64字符串
+        """
+        return b64encode(e, LOOKUP_TABLE)
 
     @staticmethod
     async def mrc(e) -> int:
@@ -100,17 +123,18 @@ class XscEncrypt:
         Returns:
             32位整数校验值
         """
-        o = -1
-
-        def unsigned_right_shift(r, n=8):
-            return (r + (1 << 32)) >> n & 0xFFFFFFFF if r < 0 else (r >> n) & 0xFFFFFFFF
+        return XscEncrypt.mrc_sync(e)
 
-        def to_js_int(num):
-            return (num + 2 ** 31) % 2 ** 32 - 2 ** 31
-
-        for char in e:
-            o = to_js_int(ie[(o & 255) ^ ord(char)] ^ unsigned_right_shift(o, 8))
-        return to_js_int(~o ^ 3988292384)
+    @staticmethod
+    def mrc_sync(e) -> int:
+        """
+        使用自定义CRC算法生成校验值 基于zlib.crc32实现 与逐字符查表的结果逐位一致
+        Args:
+            e: 输入字符串
+        Returns:
+            32位整数校验值
+        """
+        return mrc(e)
     
     @staticmethod
     async def encrypt_xsc(xs: str, xt: str, platform: str, a1: str, x1: str, x4: str, b1: str):
@@ -127,7 +151,24 @@ class XscEncrypt:
         Returns:
             xsc
         """
-        x9 = await XscEncrypt.mrc(str(xt)+xs+b1)
+        return list(XscEncrypt.encrypt_xsc_sync(xs, xt, platform, a1, x1, x4, b1))
+
+    @staticmethod
+    def encrypt_xsc_sync(xs: str, xt: str, platform: str, a1: str, x1: str, x4: str, b1: str) -> bytes:
+        """
+        同步版本的encrypt_xsc 直接输出UTF-8字节 可直接传给 b64_encode_sync
+        Args:
+            xs: 输入字符串
+            xt: 输入时间戳
+            platform: 平台信息
+            a1: 浏览器特征
+            x1: xsc版本
+            x4: 内部版本
+            b1: 浏览器指纹
+        Returns:
+            xsc
+        """
+        x9 = mrc(str(xt)+xs+b1)
         st = json.dumps({
             "s0": 1, # 1.3 版本的s0为5
             "s1": "",
@@ -144,7 +185,178 @@ class XscEncrypt:
             # "x10": random.randint(10, 29)
             "x10": 2 # 24
         }, separators=(",", ":"), ensure_ascii=False)
-        return await XscEncrypt.encrypt_encode_utf8(st)
+        return st.encode('utf-8')
+
+    @staticmethod
+    def encrypt_xsc_many(requests, platform: str, x1: str, x4: str, b1: str = "",
+                         xs_platform: str = 'xhs-pc-web') -> list:
+        """
+        批量生成 x-s / x-t / x-s-common
+        x-s-common 中与单个请求无关的字段(s0 ~ x4, x8)在循环外只序列化一次
+        Args:
+            requests: (uri, payload, a1, ts) 元组组成的列表 payload 见 serialize_payload
+            platform: 平台信息
+            x1: xsc版本
+            x4: 内部版本
+            b1: 浏览器指纹
+            xs_platform: 生成xs时使用的平台 默认为xhs-pc-web
+        Returns:
+            与requests一一对应的 (x-s, x-t, x-s-common) 元组列表
+        """
+        requests = list(requests)
+        signatures = XsEncrypt.sign_many(requests, platform=xs_platform)
+
+        identities = {}
+        result = []
+        for (_, _, a1, ts), xs in zip(requests, signatures):
+            identity = identities.get(a1)
+            if identity is None:
+                identity = identities[a1] = SigningIdentity(a1=a1, platform=platform, x1=x1, x4=x4, b1=b1,
+                                                            xs_platform=xs_platform)
+            ts = str(ts)
+            result.append((xs, ts, identity.x_s_common(xs, ts)))
+        return result
+
+
+def encode_utf8_reference(text: str) -> list:
+    """
+    encrypt_encode_utf8 的原始实现: URL编码后逐字符把 %XX 还原为字节值 用于校验等价性
+    Args:
+        text: 需要编码的字符串
+    Returns:
+        编码后的整数列表
+    """
+    encoded = urllib.parse.quote(text)
+    result = []
+    i = 0
+
+    while i < len(encoded):
+        char = encoded[i]
+        if char == '%':
+            # 获取%后面的两个字符并转换为16进制整数
+            result.append(int(encoded[i + 1:i + 3], 16))
+            i += 3  # 跳过 '%' 和后面的两个十六进制字符
+        else:
+            # 直接获取字符的ASCII码
+            result.append(ord(char))
+            i += 1
+
+    return result
+
+
+class SigningIdentity:
+    """
+    单个账号的签名身份 (a1, b1, platform, xsc版本)
+
+    x-s-common 中只有 x6(xt) / x7(xs) / x9(校验值) 随请求变化, 其余字段(包括约1.5KB的b1指纹)
+    在创建时一次性序列化为字节片段, 每次请求只拼接变化部分
+    mrc 的输入是 xt + xs + b1, 指纹位于末尾, 无法预先推进CRC状态; 这里预先编码b1,
+    在 xt + xs 的CRC状态上继续计算, 省去每次拼接和编码指纹
+
+    Args:
+        a1: Cookies中的a1
+        platform: 平台信息
+        x1: xsc版本
+        x4: 内部版本
+        b1: 浏览器指纹
+        version: 1 对应 XscEncrypt 的格式, 2 对应 XscEncryptV2 的格式
+        xs_platform: 生成xs时使用的平台 默认为xhs-pc-web
+    """
+
+    def __init__(self, a1: str, platform: str, x1: str, x4: str, b1: str = "", version: int = 1,
+                 xs_platform: str = 'xhs-pc-web'):
+        if version not in (1, 2):
+            raise ValueError(f"不支持的xsc版本: {version}")
+        self.a1 = a1
+        self.b1 = b1
+        self.platform = platform
+        self.x1 = x1
+        self.x4 = x4
+        self.version = version
+        self.xs_platform = xs_platform
+
+        def dumps(value) -> bytes:
+            return json.dumps(value, ensure_ascii=False).encode()
+
+        s0 = b'1' if version == 1 else b'5'
+        self._head = (b'{"s0":' + s0 + b',"s1":"","x0":"1","x1":' + dumps(x1) + b',"x2":' + dumps(platform) +
+                      b',"x3":"login","x4":' + dumps(x4) + b',"x5":' + dumps(a1) + b',"x6":')
+        self._b1_field = b',"x8":' + dumps(b1) + b',"x9":'
+        self._tail = b',"x10":2}' if version == 1 else b',"x10":24}'
+        try:
+            self._b1_latin1 = b1.encode('latin-1')
+        except UnicodeEncodeError:
+            self._b1_latin1 = None
+
+    def __reduce__(self):
+        # 跨进程传递时只传构造参数 接收端从缓存中取出已经序列化好的身份
+        return _identity_from_args, (self.a1, self.platform, self.x1, self.x4, self.b1, self.version,
+                                     self.xs_platform)
+
+    @typechecked
+    def x_s_common(self, xs: str, xt) -> str:
+        """
+        生成 x-s-common 请求头
+        Args:
+            xs: 本次请求的xs
+            xt: 本次请求的时间戳
+        Returns:
+            base64编码后的 x-s-common
+        """
+        xt = str(xt)
+        if self._b1_latin1 is not None:
+            x9 = mrc_concat(xt + xs, self._b1_latin1)
+        else:
+            x9 = mrc(xt + xs + self.b1)
+
+        if self.version == 1:
+            x6, x9 = str(int(xt)).encode(), str(x9).encode()
+        else:
+            x6, x9 = json.dumps(xt, ensure_ascii=False).encode(), b'"%d"' % x9
+        # xs 只包含 XYW_ 前缀与base64字符 不需要JSON转义
+        data = b''.join((self._head, x6, b',"x7":"', xs.encode(), b'"', self._b1_field, x9, self._tail))
+
+        if self.version == 1:
+            return XscEncrypt.b64_encode_sync(data)
+        return b64encode(data)
+
+    @typechecked
+    def sign(self, uri: str, payload, xt) -> tuple:
+        """
+        生成一次请求的全部签名请求头
+        Args:
+            uri: API的uri
+            payload: 参与签名的参数部分 见 serialize_payload
+            xt: 时间戳
+        Returns:
+            (x-s, x-t, x-s-common)
+        """
+        xt = str(xt)
+        xs = XsEncrypt.sign(uri, payload, self.a1, xt, self.xs_platform)
+        return xs, xt, self.x_s_common(xs, xt)
+
+
+@lru_cache(maxsize=1024)
+def _identity_from_args(a1, platform, x1, x4, b1, version, xs_platform) -> SigningIdentity:
+    return SigningIdentity(a1=a1, platform=platform, x1=x1, x4=x4, b1=b1, version=version, xs_platform=xs_platform)
+
+
+@lru_cache(maxsize=1024)
+def get_signing_identity(a1: str, xsc_schemas, b1: str = None, version: int = 1) -> SigningIdentity:
+    """
+    按 (a1, b1, xsc_schemas, version) 获取缓存的签名身份
+    Args:
+        a1: Cookies中的a1
+        xsc_schemas: xsc的版本信息参数 如 CaptchaXSCV2
+        b1: 浏览器指纹 默认使用 xsc_schemas.b1
+        version: xsc格式版本 见 SigningIdentity
+    Returns:
+        SigningIdentity
+    """
+    if b1 is None:
+        b1 = getattr(xsc_schemas, 'b1', '')
+    return SigningIdentity(a1=a1, platform=xsc_schemas.platform, x1=xsc_schemas.x1, x4=xsc_schemas.x4,
+                           b1=b1, version=version)
 
 
 if __name__ == '__main__':
@@ -1,8 +1,8 @@
 import json
 import random
-import urllib.parse
 
-from ..config import ie, lookup
+from .b64 import b64encode
+from .mrc import mrc
 
 
 class XscEncryptV2:
@@ -43,65 +43,19 @@ class XscEncryptV2:
         Returns:
             Base64编码的字符串
         """
-        if not e:
-            return ""
-            
-        # 使用标准Base64字符表
-        lookup = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
-        
-        result = []
-        length = len(e)
-        
-        # 处理完整的3字节组
-        for i in range(0, length - length % 3, 3):
-            # 将3个字节组合成24位整数
-            triplet = (e[i] << 16) + (e[i + 1] << 8) + e[i + 2]
-            # 转换为4个Base64字符
-            result.append(lookup[(triplet >> 18) & 63])
-            result.append(lookup[(triplet >> 12) & 63])
-            result.append(lookup[(triplet >> 6) & 63])
-            result.append(lookup[triplet & 63])
-        
-        # 处理剩余字节（需要填充）
-        remainder = length % 3
-        if remainder == 1:
-            # 只有1个字节，需要2个等号填充
-            last_byte = e[-1]
-            result.append(lookup[last_byte >> 2])
-            result.append(lookup[(last_byte << 4) & 63])
-            result.append("==")
-        elif remainder == 2:
-            # 有2个字节，需要1个等号填充
-            second_last = e[-2]
-            last_byte = e[-1]
-            combined = (second_last << 8) + last_byte
-            result.append(lookup[combined >> 10])
-            result.append(lookup[(combined >> 4) & 63])
-            result.append(lookup[(combined << 2) & 63])
-            result.append("=")
-            
-        return "".join(result)
+        # 与标准Base64完全一致
+        return b64encode(e)
 
     @staticmethod
     def mrc(e) -> int:
         """
-        使用自定义CRC算法生成校验值
+        使用自定义CRC算法生成校验值 基于zlib.crc32实现 与逐字符查表的结果逐位一致
         Args:
             e: 输入字符串
         Returns:
             32位整数校验值
         """
-        o = -1
-
-        def unsigned_right_shift(r, n=8):
-            return (r + (1 << 32)) >> n & 0xFFFFFFFF if r < 0 else (r >> n) & 0xFFFFFFFF
-
-        def to_js_int(num):
-            return (num + 2 ** 31) % 2 ** 32 - 2 ** 31
-
-        for char in e:
-            o = to_js_int(ie[(o & 255) ^ ord(char)] ^ unsigned_right_shift(o, 8))
-        return to_js_int(~o ^ 3988292384)
+        return mrc(e)
     
     @staticmethod
     def encrypt_xsc(xs: str, xt: str, platform: str, a1: str, x1: str, x4: str, b1: str):
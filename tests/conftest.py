@@ -0,0 +1,66 @@
+import importlib.util
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 未安装时把仓库根目录作为 xhshow 包导入
+try:
+    import xhshow  # noqa: F401
+except ImportError:
+    spec = importlib.util.spec_from_file_location("xhshow", ROOT / "__init__.py",
+                                                  submodule_search_locations=[str(ROOT)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["xhshow"] = module
+    spec.loader.exec_module(module)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    按路径返回预设的 JSON 响应 POST 时回显请求体
+
+    responses 的值为响应体 或 (状态码, 响应体); 收到的请求以 (method, path, headers) 依次记入 requests
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    responses: dict = {}
+    requests: list = []
+
+    def _reply(self, body: bytes, status: int = 200):
+        self.requests.append((self.command, self.path, dict(self.headers)))
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        response = self.responses.get(self.path.split("?")[0], {"code": 0, "success": True})
+        status, body = response if isinstance(response, tuple) else (200, response)
+        self._reply(json.dumps(body).encode(), status)
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length", 0))
+        self._reply(self.rfile.read(length) or b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """本地 HTTP 服务 返回 (base_url, responses, requests)"""
+    responses, requests = {}, []
+    handler = type("Handler", (_Handler,), {"responses": responses, "requests": requests})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", responses, requests
+    httpd.shutdown()
+    httpd.server_close()
@@ -0,0 +1,68 @@
+import asyncio
+
+from xhshow.xhs.request import AccountPool, AsyncRequestFramework, Authentication, RetryPolicy
+
+
+def test_verify_cookie_distinguishes_invalid_from_unknown(server):
+    base, responses, _ = server
+
+    async def verify(payload):
+        responses["/api/sns/web/v1/user/selfinfo"] = payload
+        async with AsyncRequestFramework(retry_policy=RetryPolicy(max_attempts=1)) as arf:
+            auth = Authentication(arf)
+            auth._host = base
+            return await auth.verify_cookie("a1=abc; web_session=xyz")
+
+    assert asyncio.run(verify({"code": 0, "success": True, "data": {}})) is True
+    assert asyncio.run(verify({"code": -100, "success": False, "msg": "登录已过期"})) is False
+    assert asyncio.run(verify({"code": 300013, "success": False})) is None
+    assert asyncio.run(verify({})) is None
+
+
+class _Authentication:
+    def __init__(self, result):
+        self.result = result
+
+    async def verify_cookie(self, cookie):
+        return self.result
+
+
+def test_validate_keeps_accounts_when_verification_is_inconclusive():
+    invalidated = []
+
+    async def on_invalid(account):
+        await asyncio.sleep(0)
+        invalidated.append(account.name)
+
+    async def main(result):
+        pool = AccountPool(["a1=one", "a1=two"], on_invalid=on_invalid)
+        checked = await pool.validate(_Authentication(result))
+        await asyncio.sleep(0.01)
+        return checked, [account.valid for account in pool]
+
+    assert asyncio.run(main(None)) == ({}, [None, None])
+    assert invalidated == []
+    assert asyncio.run(main(False)) == ({"one": False, "two": False}, [False, False])
+    assert invalidated == ["one", "two"]
+
+
+def test_retry_switches_away_from_cooling_account(server):
+    base, responses, requests = server
+    responses["/api/sns/web/v1/feed"] = (429, {"code": -1})
+
+    async def main(pinned):
+        pool = AccountPool(["a1=one", "a1=two"])
+        async with AsyncRequestFramework(account_pool=pool, retry_policy=RetryPolicy(base_delay=0.01)) as arf:
+            result = await arf.send_http_request(f"{base}/api/sns/web/v1/feed",
+                                                 account=pool.get("one") if pinned else None)
+        return result, {account.name: (account.in_use, account.cooling()) for account in pool}
+
+    result, accounts = asyncio.run(main(pinned=False))
+    assert result == {}
+    assert sorted(headers["Cookie"] for _, _, headers in requests) == ["a1=one", "a1=two"]
+    assert accounts == {"one": (0, True), "two": (0, True)}
+
+    requests.clear()
+    result, accounts = asyncio.run(main(pinned=True))
+    assert [headers["Cookie"] for _, _, headers in requests] == ["a1=one"]
+    assert accounts["two"] == (0, False)
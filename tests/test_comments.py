@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from xhshow.xhs.request import Comments, RateLimiter, RateRule
+
+
+class _Client:
+    """按游标返回两页评论 第一条评论有一页子评论"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, uri, params):
+        self.calls.append((uri, time.monotonic()))
+        if uri.endswith("/sub/page"):
+            return {"comments": [{"id": "s2"}], "has_more": False, "cursor": ""}
+        if not params["cursor"]:
+            return {"has_more": True, "cursor": "c1", "comments": [
+                {"id": "c0", "sub_comment_count": "2", "sub_comments": [{"id": "s1"}],
+                 "sub_comment_has_more": True, "sub_comment_cursor": "s1"},
+            ]}
+        return {"has_more": False, "cursor": "", "comments": []}
+
+
+def test_get_all_comments_is_paced_by_the_rate_limiter():
+    client = _Client()
+    limiter = RateLimiter([RateRule("/api/sns/web/v2/comment/*", rate=20.0, burst=1)])
+    comments = Comments(client, rate_limiter=limiter, a1="abc")
+
+    result = asyncio.run(comments.get_all_comments("note"))
+
+    assert [comment["id"] for comment in result] == ["c0", "s1", "s2"]
+    assert len(client.calls) == 3
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(client.calls, client.calls[1:])]
+    assert min(gaps) >= 0.04
@@ -0,0 +1,80 @@
+import asyncio
+
+from xhshow import CaptchaXSC
+from xhshow.xhs.request import AdaptiveConcurrency, AsyncRequestFramework, RetryPolicy
+
+
+def test_throttle_code_in_body_shrinks_adaptive_window(server):
+    base, responses, _ = server
+    responses["/api/sns/web/v1/feed"] = {"code": 300013, "success": False, "msg": "访问频次异常"}
+
+    async def main():
+        async with AsyncRequestFramework() as arf:
+            arf.adaptive = AdaptiveConcurrency(arf.limiter, cooldown=0)
+            result = await arf.send_http_request(f"{base}/api/sns/web/v1/feed")
+            return result, arf.adaptive.stats()["127.0.0.1"]
+
+    result, stats = asyncio.run(main())
+    assert result["code"] == 300013
+    assert stats["decreases"] == 1
+    assert stats["last_reason"] == "throttled"
+
+
+def test_coalesced_posts_with_different_json_bodies_are_not_merged(server):
+    base, _, _ = server
+
+    async def main():
+        async with AsyncRequestFramework(single_flight=True) as arf:
+            return await asyncio.gather(*(
+                arf.send_http_request(f"{base}/api/sns/web/v1/feed", method="POST", json={"i": i}, coalesce=True)
+                for i in range(3)
+            )), arf.single_flight.stats()
+
+    results, stats = asyncio.run(main())
+    assert [result["i"] for result in results] == [0, 1, 2]
+    assert stats["shared"] == 0
+
+
+def test_back_fun_returns_response_with_buffered_body(server):
+    base, responses, _ = server
+    responses["/proxies"] = {"code": 0, "data": ["127.0.0.1:8080"]}
+
+    async def main():
+        async with AsyncRequestFramework(max_sessions=1, idle_timeout=0) as arf:
+            response = await arf.send_http_request(f"{base}/proxies", back_fun=True)
+            # 会话已归还并被回收 响应体仍然可读
+            await arf.send_http_request(f"{base}/other")
+            return response
+
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    assert response.json() == {"code": 0, "data": ["127.0.0.1:8080"]}
+
+
+def test_max_retries_zero_sends_a_single_attempt(server):
+    base, responses, requests = server
+    responses["/api/sns/web/v1/feed"] = (503, {"code": -1})
+
+    async def main():
+        async with AsyncRequestFramework() as arf:
+            return await arf.send_http_request(f"{base}/api/sns/web/v1/feed", max_retries=0)
+
+    assert asyncio.run(main()) == {"code": -1}
+    assert len(requests) == 1
+
+
+def test_retries_are_signed_again(server):
+    base, responses, requests = server
+    responses["/api/sns/web/v1/feed"] = (429, {"code": -1})
+    a1 = "18c2a3f4b9dgk2mb1h3x8m9n0p7q6r5s4t3u2v1w0x9y8z7a6b5c4d"
+
+    async def main():
+        async with AsyncRequestFramework(retry_policy=RetryPolicy(max_attempts=2, base_delay=0.02)) as arf:
+            return await arf.send_http_request(f"{base}/api/sns/web/v1/feed", uri="/api/sns/web/v1/feed",
+                                               params={"num": 1}, auto_sign=True, cookie={"a1": a1}, retry_delay=0.01,
+                                               xsc_schemas=CaptchaXSC)
+
+    assert asyncio.run(main()) == {"code": -1}
+    timestamps = [headers["x-t"] for _, _, headers in requests]
+    assert len(timestamps) == 2
+    assert timestamps[0] != timestamps[1]
@@ -0,0 +1,29 @@
+import pytest
+from typeguard import TypeCheckError
+
+from xhshow import CaptchaXSCV2, configure
+from xhshow.encrypt import XsEncrypt, get_signing_identity
+
+A1 = "1922f161f3akc5946vixc5zs8ykvvm48u8tt7ele550000297995"
+
+
+@pytest.fixture
+def validate_mode():
+    initial = configure()["validate"]
+    yield
+    configure(validate=initial)
+
+
+def test_configure_switches_the_request_signing_path(validate_mode):
+    identity = get_signing_identity(A1, CaptchaXSCV2)
+
+    configure(validate=True)
+    with pytest.raises(TypeCheckError):
+        identity.sign(b"/api/sns/web/v1/feed", None, 1732352811091)
+    with pytest.raises(TypeCheckError):
+        XsEncrypt.sign_many([("/api/sns/web/v1/feed", None, A1, "1732352811091")], platform=None)
+
+    # 快速模式下不做类型检查 错误类型的参数照常参与签名
+    configure(validate=False)
+    xs, xt, _ = identity.sign(b"/api/sns/web/v1/feed", None, 1732352811091)
+    assert xs.startswith("XYW_") and xt == "1732352811091"
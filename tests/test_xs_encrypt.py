@@ -0,0 +1,13 @@
+import hashlib
+
+from xhshow.encrypt.xs_encrypt import XsEncrypt
+
+
+def test_encrypt_x1_hashes_uri_and_serialized_payload():
+    uri = "/api/sns/web/v1/user_posted"
+    query = '?{"num":30,"cursor":"","user_id":"5f2b6d0e000000000101d1c1"}'
+    expected = hashlib.md5(f"url={uri}{query}".encode()).hexdigest()
+
+    assert XsEncrypt.encrypt_x1(uri, query) == expected
+    assert XsEncrypt.encrypt_x1(uri, query.encode()) == expected
+    assert XsEncrypt.encrypt_x1(uri) == hashlib.md5(f"url={uri}".encode()).hexdigest()
@@ -10,6 +10,17 @@ from . import request
 # 尝试导入主要的请求类
 try:
     from .request.AsyncRequestFramework import AsyncRequestFramework
+    from .request.session_pool import SessionPool
+    from .request.concurrency import ConcurrencyLimiter
+    from .request.adaptive import AdaptiveConcurrency
+    from .request.rate_limit import RateLimiter, RateRule
+    from .request.retry import RetryBudget, RetryPolicy
+    from .request.single_flight import SingleFlight
+    from .request.cache import ResponseCache
+    from .request.codec import JsonCodec, LazyResponse, OrjsonCodec, get_codec
+    from .request.timing import RequestTiming, TimingRecorder
+    from .request.loop_monitor import LoopLagMonitor, StallEvent
+    from .request.account_pool import Account, AccountPool
     from .request.auth import Authentication
     from .request.comments import Comments
     from .request.feeds import Feeds
@@ -22,6 +33,25 @@ try:
     __all__ = [
         'request',
         'AsyncRequestFramework',
+        'SessionPool',
+        'ConcurrencyLimiter',
+        'AdaptiveConcurrency',
+        'RateLimiter',
+        'RateRule',
+        'RetryPolicy',
+        'RetryBudget',
+        'SingleFlight',
+        'ResponseCache',
+        'JsonCodec',
+        'OrjsonCodec',
+        'LazyResponse',
+        'get_codec',
+        'TimingRecorder',
+        'RequestTiming',
+        'LoopLagMonitor',
+        'StallEvent',
+        'AccountPool',
+        'Account',
         'Authentication',
         'Comments', 
         'Feeds',
@@ -2,31 +2,115 @@ import asyncio
 import json
 import time
 from collections.abc import Mapping
-from urllib.parse import urlencode
+from functools import partial
+from urllib.parse import urlencode, urlsplit
 
 from curl_cffi.requests import AsyncSession, Response
 from loguru import logger
 
-from ...encrypt import MiscEncrypt, XscEncrypt, XsEncrypt
+from ...encrypt import MiscEncrypt, SigningPool, get_signing_identity
+from .account_pool import Account, AccountPool, classify_account
+from .adaptive import AdaptiveConcurrency, classify
+from .cache import ResponseCache
+from .codec import JsonCodec, LazyResponse, get_codec
+from .concurrency import ConcurrencyLimiter
+from .rate_limit import RateLimiter
+from .retry import HTTP_STATUS, OTHER, RetryPolicy, ThrottledLog, classify_error
+from .loop_monitor import LoopLagMonitor
+from .session_pool import SessionPool
+from .timing import RequestTiming, TimingRecorder, curl_phases, endpoint_of
+from .single_flight import SingleFlight, request_key
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
 
 
 class AsyncRequestFramework:
     """异步请求框架
 
+    会话按 (proxy, impersonate, verify) 从会话池中复用 建议通过 async with 使用 退出时关闭所有会话
+
     Args:
         verify_ssl (bool, optional): 是否验证 SSL 证书 默认为 True
+        signing_pool (SigningPool, optional): 多进程签名服务 默认为 None 即在事件循环中直接签名
+        impersonate (str, optional): 签名请求使用的浏览器指纹 默认为 chrome124
+        max_sessions (int, optional): 会话池最多保留的会话数量 默认为 16
+        idle_timeout (float, optional): 空闲会话的最长保留时间(秒) 默认为 60
+        session_pool (SessionPool, optional): 自定义会话池 传入时忽略 max_sessions 与 idle_timeout
+        max_concurrency (int, optional): 全局最大并发请求数 默认为 64 None 表示不限制
+        host_limits (dict, optional): 各域名的最大并发数 与 concurrency.DEFAULT_HOST_LIMITS 合并
+        limiter (ConcurrencyLimiter, optional): 自定义并发限制器 传入时忽略 max_concurrency 与 host_limits
+        rate_limiter (RateLimiter, optional): 按 (a1, URI) 限速的令牌桶 默认使用 rate_limit.DEFAULT_RULES
+        adaptive (AdaptiveConcurrency or bool, optional): 按延迟与错误率自动调整各域名并发数 True 使用默认参数 默认关闭
+        retry_policy (RetryPolicy, optional): 重试策略 默认为 RetryPolicy() 重试预算在同一实例的所有请求间共享
+        single_flight (bool, optional): 是否合并并发的相同请求 默认为 False
+            开启后 (method, URL, 参数, 账号) 相同的 GET 请求只发送一次 所有调用方共享解码后的结果
+        cache (ResponseCache or bool, optional): GET 响应缓存 True 使用默认参数(仅内存) 默认关闭
+        log_interval (float, optional): 相同域名、相同错误类型的日志最短输出间隔(秒) 默认为 5
+        json_codec (JsonCodec or str, optional): 请求体序列化与响应解析使用的 JSON 编解码器 默认安装了 orjson 时使用 orjson
+        lazy_json (bool, optional): 是否默认返回 LazyResponse 第一次读取字段时才解析 JSON 默认为 False
+        timing (TimingRecorder or bool, optional): 按接口记录签名、排队、连接、TLS、首字节、下载、解码等各阶段耗时
+            True 使用默认参数 默认关闭 见 metrics()["timing"] 与 timing.prometheus()
+        loop_monitor (LoopLagMonitor or bool, optional): 监控事件循环调度延迟 定位阻塞事件循环的代码
+            True 使用默认参数 开启 timing 时延迟同时记入 timing 默认关闭 在第一次请求或 async with 时启动
+        account_pool (AccountPool, optional): 多账号池 未传入 cookie 的请求从池中选择账号 并按响应更新账号状态
+            重试前账号进入冷却时换用池中的其他账号
     """
-    def __init__(self, verify_ssl=True):
+    def __init__(self, verify_ssl=True, signing_pool: SigningPool = None, impersonate: str = "chrome124",
+                 max_sessions: int = 16, idle_timeout: float = 60.0, session_pool: SessionPool = None,
+                 max_concurrency: int = 64, host_limits: dict = None, limiter: ConcurrencyLimiter = None,
+                 rate_limiter: RateLimiter = None, adaptive: AdaptiveConcurrency | bool = False,
+                 retry_policy: RetryPolicy = None, log_interval: float = 5.0, single_flight: bool = False,
+                 cache: ResponseCache | bool = False, json_codec: JsonCodec | str = None,
+                 lazy_json: bool = False, timing: TimingRecorder | bool = False,
+                 loop_monitor: LoopLagMonitor | bool = False, account_pool: AccountPool = None):
         self.verify_ssl = verify_ssl
+        self.signing_pool = signing_pool
+        self.impersonate = impersonate
+        self.sessions = session_pool or SessionPool(max_size=max_sessions, idle_timeout=idle_timeout)
+        self.limiter = limiter or ConcurrencyLimiter(global_limit=max_concurrency, host_limits=host_limits)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        if adaptive is True:
+            adaptive = AdaptiveConcurrency(self.limiter)
+        self.adaptive = adaptive or None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._retry_log = ThrottledLog(log_interval)
+        self.single_flight = SingleFlight() if single_flight else None
+        self.codec = get_codec(json_codec)
+        self.lazy_json = lazy_json
+        self.timing = TimingRecorder() if timing is True else timing or None
+        if loop_monitor is True:
+            loop_monitor = LoopLagMonitor(timing=self.timing)
+        self.loop_monitor = loop_monitor or None
+        self.account_pool = account_pool
+        self._own_cache = cache is True
+        self.cache = ResponseCache() if cache is True else cache or None
+
+    async def __aenter__(self):
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """关闭会话池中的所有会话 以及由框架创建的缓存 并停止事件循环监控"""
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+        await self.sessions.close()
+        if self._own_cache:
+            self.cache.close()
 
     async def init_session(self):
         """初始化异步会话
 
-        创建一个新的 AsyncSession 实例
+        创建一个新的 AsyncSession 实例 不经过会话池 由调用方负责关闭
         """
         return AsyncSession(
             verify=self.verify_ssl,
-            impersonate="chrome124"
+            impersonate=self.impersonate
         )
 
     async def close_session(self, session: AsyncSession):
@@ -36,50 +120,75 @@ class AsyncRequestFramework:
         """
         return await session.close()
 
-    async def __pre_headers(
-        self,
-        uri: str,
-        xsc_schemas,
-        a1: str,
-        cookie: dict,
-        method: str,
-        params: dict,
-        data: dict,
-    ):
-        session = await self.init_session()
-        session.cookies.update(cookie)
+    def _build_request(self, method: str, params, data, headers: dict, kwargs: dict) -> tuple:
+        """
+        构建请求体 只序列化一次 签名与发送使用同一份 bytes
 
-        xt = str(int(time.time() * 1000))
+        dict/list 形式的 data 与 json 参数由 self.codec 序列化为 JSON 后作为 data 发送,
+        未指定 content-type 时补上 application/json
+
+        Args:
+            method: 大写的 HTTP 请求方法
+            params: URL 查询参数
+            data: 请求体
+            headers: 请求头 会被原地修改
+            kwargs: 传给 curl_cffi 的其他参数 其中的 json 会被取出
+        Returns:
+            (参与签名的 payload, 实际发送的 data) GET 的 payload 为 "?" + 参数JSON 其他方法不签名时为 None
+        """
+        body = kwargs.pop('json', None)
+        if body is None and isinstance(data, (dict, list)):
+            body = data
+        if body is not None:
+            data = self.codec.dumps(body)
+            if not any(name.lower() == 'content-type' for name in headers):
+                headers['content-type'] = 'application/json;charset=UTF-8'
 
         match method:
             case 'GET':
-                xs = await XsEncrypt.encrypt_xs(url=f"{uri}?{json.dumps(params, separators=(',', ':'), ensure_ascii=False)}",
-                                                a1=a1, ts=xt)
+                return b'?' + self.codec.dumps(params), data
             case 'POST':
-                xs = await XsEncrypt.encrypt_xs(url=f"{uri}{json.dumps(data,separators=(',', ':'),ensure_ascii=False)}",
-                                                a1=a1, ts=xt)
+                # 没有请求体时与此前一致 对 "null" 签名
+                return (b'null' if data is None else data), data
             case _:
-                xs = ""
+                return None, data
 
-        xsc = await XscEncrypt.encrypt_xsc(xs=xs, xt=xt, platform=xsc_schemas.platform, a1=a1,
-                                           x1=xsc_schemas.x1, x4=xsc_schemas.x4)
+    async def __pre_headers(self, uri: str, xsc_schemas, a1: str, payload):
+        """
+        生成签名请求头
+
+        Args:
+            uri: 请求的 URI
+            xsc_schemas: xsc 的版本信息参数
+            a1: Cookies 中的 a1
+            payload: 参与签名的 payload 见 _build_request 为 None 时 x-s 为空
+        Returns:
+            签名请求头
+        """
+        xt = str(int(time.time() * 1000))
+        identity = get_signing_identity(a1, xsc_schemas)
 
-        session.headers.update({"x-s": xs})
-        session.headers.update({"x-t": xt})
-        session.headers.update({"x-s-common": xsc})
+        if payload is None:
+            xs, xsc = "", identity.x_s_common("", xt)
+        elif self.signing_pool is not None:
+            xs, xt, xsc = await self.signing_pool.sign(identity, uri, payload, xt)
+        else:
+            xs, xt, xsc = identity.sign(uri, payload, xt)
 
-        x_b3 = await MiscEncrypt.x_b3_traceid()
+        x_b3 = MiscEncrypt.x_b3_traceid_sync()
 
-        session.headers.update({
+        return {
+            "x-s": xs,
+            "x-t": xt,
+            "x-s-common": xsc,
             "x-b3-traceid": x_b3,
-            "x-xray-traceid": await MiscEncrypt.x_xray_traceid(x_b3),
-        })
-
-        return session
+            "x-xray-traceid": MiscEncrypt.x_xray_traceid_sync(x_b3),
+        }
 
     async def send_http_request(self, url, method='GET', xsc_schemas=None, uri: str = "", auto_sign: bool = False,
                                 params=None, data=None, headers=None, timeout=5, proxy=None, cookie=None, back_fun=False,
-                                max_retries=3, retry_delay=0.1, **kwargs):
+                                max_retries=None, retry_delay=None, coalesce: bool = None, cache_ttl: float = None,
+                                account: Account = None, **kwargs):
         """发送 HTTP 请求
 
         Args:
@@ -93,78 +202,313 @@ class AsyncRequestFramework:
             headers (dict, optional): 请求头
             timeout (int, optional): 请求超时时间 默认为 5 秒
             proxy (dict, optional): 代理设置
-            cookie (dict, optional): Cookie 信息
-            back_fun (bool, optional): 是否返回响应对象 默认为 False
-            max_retries (int, optional): 最大重试次数 默认为 3 次
-            retry_delay (float, optional): 重试延迟时间 默认为 0.1 秒
+            cookie (dict, optional): Cookie 信息 为空且设置了 account_pool 时从账号池中选择账号
+            back_fun (bool, optional): 是否返回响应对象 响应体已读入 response.content 不能再调用 acontent() 默认为 False
+            max_retries (int, optional): 最多尝试次数 默认使用 retry_policy.max_attempts (3 次) 0 与 1 相同 只尝试一次
+            retry_delay (float, optional): 重试前的最短等待时间 默认为 None 即只按 retry_policy 指数退避
+                重试同样需要从限速器取得令牌
+            coalesce (bool, optional): 是否与正在进行的相同请求合并 默认为 None
+                即开启 single_flight 时合并 GET 请求 back_fun 为 True 时不合并
+            cache_ttl (float, optional): 本次请求的缓存时间(秒) 默认为 None 即按 cache.ttl_for(uri) 0 表示不使用缓存
+            html_mode (bool, optional): 返回解码后的文本 不尝试解析 JSON 默认为 False
+            lazy (bool, optional): 返回 LazyResponse 保留原始字节 第一次读取字段时才解析 默认为 lazy_json
+            account (Account, optional): 指定使用账号池中的账号 如翻页时固定同一个账号 忽略 cookie
+                该账号触发风控进入冷却后不再重试
             **kwargs: 其他参数
 
         Returns:
             dict: 返回的 JSON 数据或错误信息
         """
+        if self.loop_monitor is not None and not self.loop_monitor.running:
+            self.loop_monitor.start()
+        if account is not None:
+            cookie = account.cookie
+        # 从账号池中选择账号的请求不区分账号 可以共享缓存与合并
+        key = request_key(method, url, params, data, cookie.get("a1") if cookie else None, kwargs.get('json'))
+
+        on_content = None
+        html_mode = kwargs.get('html_mode', False)
+        if self.cache is not None and not back_fun and method.upper() == 'GET':
+            ttl = self.cache.ttl_for(uri or urlsplit(url).path) if cache_ttl is None else cache_ttl
+            if ttl:
+                body = await self.cache.get(key)
+                if body is not None:
+                    return self._decode(body, html_mode, kwargs.get('lazy'))
+                on_content = partial(self._store, key, ttl, html_mode)
+
+        request = partial(self._send_http_request, url, method=method, xsc_schemas=xsc_schemas, uri=uri,
+                          auto_sign=auto_sign, params=params, data=data, headers=headers, timeout=timeout,
+                          proxy=proxy, cookie=cookie, back_fun=back_fun, max_retries=max_retries,
+                          retry_delay=retry_delay, on_content=on_content, account=account, **kwargs)
+        timing = None
+        if self.timing is not None:
+            timing = RequestTiming(endpoint_of(uri or urlsplit(url).path), method.upper())
+            request = partial(request, timing=timing)
+        if cookie is None and self.account_pool is not None:
+            request = partial(request, pooled=True)
+        if timing is not None:
+            request = partial(self._timed, request, timing)
+        if coalesce is None:
+            coalesce = self.single_flight is not None and method.upper() == 'GET'
+        if not coalesce or back_fun or self.single_flight is None:
+            return await request()
+        return await self.single_flight.do(key, request)
+
+    def _report_account(self, account: Account, status: int = None, headers=None, payload=None):
+        """把请求结果交给账号池 未使用账号池时忽略"""
+        if account is not None and self.account_pool is not None:
+            self.account_pool.report(account, classify_account(status, headers, payload))
+
+    async def _timed(self, request, timing: RequestTiming):
+        """执行请求并记录总耗时 合并到其他请求上的调用与缓存命中不会走到这里"""
+        started = time.perf_counter()
+        try:
+            return await request()
+        except asyncio.CancelledError:
+            timing.error = "cancelled"
+            raise
+        finally:
+            timing.total = time.perf_counter() - started
+            await self.timing.record(timing)
+
+    def _decode(self, content: bytes, html_mode: bool = False, lazy: bool = None):
+        """
+        解码响应体
 
-        if headers is None:
-            headers = {}
-        if proxy == {}:
-            proxy = None
-
-        if auto_sign:
-            session = await self.__pre_headers(
-                uri=uri,
-                xsc_schemas=xsc_schemas,
-                a1=cookie["a1"],
-                cookie=cookie,
-                method=method,
-                params=params,
-                data=data
-            )
-        else:
-            session = AsyncSession()
-
-        method = method.upper()
-        kwargs['stream'] = True
-
-        for attempt in range(max_retries):
+        Args:
+            content: 响应体原始字节
+            html_mode: 直接返回文本
+            lazy: 以 { 开头的响应体返回 LazyResponse 默认为 self.lazy_json
+        Returns:
+            解析后的对象 / LazyResponse / JSON 解析失败或 html_mode 时返回文本
+        """
+        if html_mode:
+            return content.decode('utf-8', errors='replace')
+        if (self.lazy_json if lazy is None else lazy) and content[:64].lstrip()[:1] == b'{':
+            return LazyResponse(content, self.codec)
+        try:
+            return self.codec.loads(content)
+        except self.codec.decode_error as e:
+            logger.warning("响应不是合法的 JSON ({}) 按文本返回: {!r}", e, content[:200])
+        return content.decode('utf-8', errors='replace')
+
+    async def _store(self, key, ttl: float, html_mode: bool, status: int, content: bytes, result):
+        """只缓存成功的响应 业务失败(success 为 False)与无法解析的 JSON 不缓存"""
+        if status != 200 or not content:
+            return
+        if isinstance(result, LazyResponse):
             try:
-                response: Response = await session.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    data=data,
-                    headers=headers,
-                    proxy=proxy,
-                    timeout=timeout,
-                    cookies=cookie,
-                    quote=False,
-                    **kwargs
-                )
-
-                if back_fun:
-                    return response
-
-                if response.status_code == 404:
-                    logger.error(f" {url} 状态404")
-                    return {}
-
-                content = await response.acontent()
+                result.data
+            except self.codec.decode_error:
+                return
+        if isinstance(result, Mapping) and result.get("success", True) is False:
+            return
+        if isinstance(result, str) and not html_mode:
+            return
+        await self.cache.set(key, content, ttl)
+
+    async def _send_http_request(self, url, method='GET', xsc_schemas=None, uri: str = "", auto_sign: bool = False,
+                                 params=None, data=None, headers=None, timeout=5, proxy=None, cookie=None,
+                                 back_fun=False, max_retries=None, retry_delay=None, on_content=None, timing: RequestTiming = None,
+                                 account: Account = None, pooled: bool = False, **kwargs):
+        """
+        send_http_request 的实际实现
 
+        on_content 为读取响应体后的回调 (status, content, result), timing 不为 None 时记录各阶段耗时,
+        account 不为 None 时按响应更新账号状态, pooled 为 True 时从账号池中取出账号 结束后归还
+        """
+        if pooled:
+            account = await self.account_pool.acquire()
+            cookie = account.cookie
+        try:
+            html_mode = kwargs.pop('html_mode', False)
+            lazy = kwargs.pop('lazy', None)
+            headers = dict(headers) if headers else {}
+            if proxy == {}:
+                proxy = None
+
+            method = method.upper()
+            payload, data = self._build_request(method, params, data, headers, kwargs)
+
+            if auto_sign:
+                session_key = (proxy, self.impersonate, self.verify_ssl)
+            else:
+                session_key = (proxy, None, True)
+
+            kwargs['stream'] = True
+            # 会话在多个账号之间共用 Cookie 每次请求单独传入 不写回会话
+            kwargs.setdefault('discard_cookies', True)
+            a1 = cookie.get("a1") if cookie else None
+            rate_uri = uri or urlsplit(url).path
+
+            policy = self.retry_policy
+            max_attempts = policy.max_attempts if max_retries is None else max(1, max_retries)
+            host = urlsplit(url).hostname or ""
+            policy.budget.on_request()
+
+            for attempt in range(max_attempts):
+                slot = None
+                delay = None
+                if timing is not None:
+                    timing.retries = attempt
+                request_headers = headers
+                if auto_sign:
+                    # 每次尝试重新签名 退避等待之后 x-t 仍是当前时间
+                    signing = time.perf_counter()
+                    # 签名头作为请求头传入 调用方传入的同名请求头优先
+                    request_headers = {**await self.__pre_headers(
+                        uri=uri,
+                        xsc_schemas=xsc_schemas,
+                        a1=cookie["a1"],
+                        payload=payload
+                    ), **headers}
+                    if timing is not None:
+                        timing.add("sign", time.perf_counter() - signing)
                 try:
-                    return json.loads(content)
-                except json.JSONDecodeError as e:
-                    logger.exception(e)
-                    return content.decode('utf-8', errors='replace')
-
-            except Exception as e:
-                logger.error(
-                    f"尝试 {attempt + 1}/{max_retries}: {url} data:{json.dumps(data) if isinstance(data, (dict, list)) else data}"
-                    f" params:{json.dumps(params) if isinstance(params, (dict, list)) else params} headers: {headers} 请求错误 {e}")
-                logger.exception(e)
-
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                else:
-                    logger.error(f"重试{max_retries}次后仍然失败")
-                    return {}
+                    waited = await self.rate_limiter.acquire(a1, rate_uri)
+                    if timing is not None:
+                        timing.add("rate_limit", waited)
+                    async with self.limiter.slot(url) as slot, self.sessions.session(*session_key) as session:
+                        response: Response = await session.request(
+                            method=method,
+                            url=url,
+                            params=params,
+                            data=data,
+                            headers=request_headers,
+                            timeout=timeout,
+                            cookies=cookie,
+                            quote=False,
+                            **kwargs
+                        )
+                        status = response.status_code
+                        if timing is not None:
+                            timing.status = status
+                            timing.update(curl_phases(response.infos))
+
+                        if policy.retryable_status(status):
+                            delay = self._next_delay(attempt, HTTP_STATUS, max_attempts, retry_delay,
+                                                     response.headers.get("retry-after"))
+
+                        if delay is not None:
+                            self._report_account(account, status, response.headers)
+                            await response.aclose()
+                        elif back_fun:
+                            # 流式响应在会话归还之后可能被回收的会话关闭 先读完响应体
+                            # 响应体只能读取一次 调用方应使用 response.content 不要再调用 acontent()
+                            response.content = await response.acontent()
+                            self._observe(slot, status, response.headers)
+                            self._report_account(account, status, response.headers)
+                            self._timing_queue(timing, slot)
+                            return response
+                        elif status == 404:
+                            logger.error(f" {url} 状态404")
+                            await response.aclose()
+                            self._observe(slot, status)
+                            self._timing_queue(timing, slot)
+                            self._report_account(account, status)
+                            return {}
+                        else:
+                            # 在归还会话之前读完响应体 避免读取过程中会话被回收
+                            downloading = time.perf_counter()
+                            content = await response.acontent()
+                            if timing is not None:
+                                timing.download = time.perf_counter() - downloading
+
+                    logger.debug("{} 排队 {:.1f}ms 网络 {:.1f}ms", url, slot.queue_wait * 1e3,
+                                 slot.network_time * 1e3)
+                    self._timing_queue(timing, slot)
+
+                    if delay is None:
+                        decoding = time.perf_counter()
+                        result = self._decode(content, html_mode, lazy)
+                        if timing is not None:
+                            timing.decode = time.perf_counter() - decoding
+                        # 风控业务码(300012/300013)在响应体中 需要解码后再交给自适应并发控制
+                        self._observe(slot, status, response.headers, result)
+                        self._report_account(account, status, response.headers, result)
+                        if on_content is not None:
+                            await on_content(status, content, result)
+                        return result
+
+                    self._observe(slot, status, response.headers)
+                    if account is not None and account.cooling():
+                        # 触发风控的账号已进入冷却 换用池中的其他账号 没有其他可用账号时不再重试
+                        replacement = self.account_pool.try_acquire(exclude=account) if pooled else None
+                        if replacement is None:
+                            self._retry_log.log("WARNING", ("cooling", host, HTTP_STATUS), lambda: (
+                                f"{method} {url} 状态{status} 账号 {account.name} 冷却中 没有其他可用账号 不再重试"))
+                            return {}
+                        self.account_pool.release(account)
+                        account, cookie, a1 = replacement, replacement.cookie, replacement.a1
+                    self._retry_log.log("WARNING", ("retry", host, HTTP_STATUS), lambda: (
+                        f"{method} {url} 状态{status} 第{attempt + 1}/{max_attempts}次 {delay:.2f}s 后重试"))
+
+                except Exception as e:
+                    self._observe(slot, error=e)
+                    self._timing_queue(timing, slot)
+                    kind = classify_error(e)
+                    delay = self._next_delay(attempt, kind, max_attempts, retry_delay)
+                    if delay is None:
+                        if timing is not None:
+                            timing.error = kind
+                        self._retry_log.log("ERROR", ("failed", host, kind), lambda: (
+                            f"{method} {url} 请求失败 共尝试{attempt + 1}次 ({kind}) {e!r}"),
+                            exception=e if kind == OTHER else None)
+                        logger.opt(lazy=True).debug("{} data: {} params: {}", lambda: url,
+                                                    lambda: _dumps(data), lambda: _dumps(params))
+                        return {}
+                    self._retry_log.log("WARNING", ("retry", host, kind), lambda: (
+                        f"{method} {url} 第{attempt + 1}/{max_attempts}次失败 ({kind}) {e!r} {delay:.2f}s 后重试"))
+
+                await asyncio.sleep(delay)
+
+            return {}
+        finally:
+            if pooled:
+                # 重试时可能已换用其他账号 归还当前持有的账号
+                self.account_pool.release(account)
+
+    @staticmethod
+    def _timing_queue(timing: RequestTiming, slot):
+        """累计本次尝试在并发限制器中的排队时间"""
+        if timing is not None and slot is not None:
+            timing.add("queue", slot.queue_wait)
+
+    def _next_delay(self, attempt: int, kind: str, max_attempts: int, retry_delay: float = None,
+                    retry_after=None):
+        """按重试策略计算等待时间 retry_delay 为调用方指定的最短等待时间"""
+        delay = self.retry_policy.next_delay(attempt, kind, max_attempts, retry_after)
+        if delay is not None and retry_delay is not None:
+            delay = max(delay, retry_delay)
+        return delay
+
+    def _observe(self, slot, status: int = None, headers=None, payload=None, error: BaseException = None):
+        """把请求结果交给自适应并发控制 未开启或请求未占用名额时忽略"""
+        if self.adaptive is not None and slot is not None:
+            self.adaptive.record(slot.host, slot.elapsed, classify(status, headers, payload, error))
+
+    def metrics(self) -> dict:
+        """
+        请求框架的运行指标
+
+        Returns:
+            {"concurrency": 各域名并发与排队统计, "adaptive": 各域名自适应窗口, "rate_limit": 令牌桶状态,
+             "sessions": 会话池状态, "retry": 重试预算, "single_flight": 请求合并统计,
+             "cache": 响应缓存命中统计, "timing": 各接口各阶段耗时 见 TimingRecorder.snapshot,
+             "loop": 事件循环延迟与阻塞位置 见 LoopLagMonitor.stats, "accounts": 账号池状态}
+        """
+        return {
+            "concurrency": self.limiter.stats(),
+            "adaptive": self.adaptive.stats() if self.adaptive is not None else {},
+            "rate_limit": self.rate_limiter.stats(),
+            "sessions": self.sessions.stats(),
+            "retry": self.retry_policy.budget.stats(),
+            "single_flight": self.single_flight.stats() if self.single_flight is not None else {},
+            "cache": self.cache.stats() if self.cache is not None else {},
+            "timing": self.timing.snapshot() if self.timing is not None else {},
+            "loop": self.loop_monitor.stats() if self.loop_monitor is not None else {},
+            "accounts": self.account_pool.stats() if self.account_pool is not None else {},
+        }
 
     async def get_redirect_url(self, url: str) -> Mapping:
         """获取重定向 URL
@@ -176,21 +520,21 @@ class AsyncRequestFramework:
             dict: 包含原始 URL、最终 URL 和状态码的字典
         """
         try:
-            await self.init_session()
-            response = await self.session.get(url, allow_redirects=False)
+            async with self.sessions.session(None, self.impersonate, self.verify_ssl) as session:
+                response = await session.get(url, allow_redirects=False)
 
-            if response.status in (301, 302, 303, 307, 308):
+            if response.status_code in (301, 302, 303, 307, 308):
                 redirect_url = response.headers.get('Location')
                 return {
                     'original_url': url,
                     'final_url': redirect_url,
-                    'status': response.status
+                    'status': response.status_code
                 }
 
             return {
                 'original_url': url,
                 'final_url': str(response.url),
-                'status': response.status
+                'status': response.status_code
             }
 
         except Exception as e:
@@ -6,6 +6,17 @@ XHShow 请求模块
 
 # 导出所有请求相关的类和枚举
 from .AsyncRequestFramework import AsyncRequestFramework
+from .session_pool import SessionPool
+from .concurrency import ConcurrencyLimiter
+from .adaptive import AdaptiveConcurrency
+from .rate_limit import RateLimiter, RateRule
+from .retry import RetryBudget, RetryPolicy
+from .single_flight import SingleFlight
+from .cache import ResponseCache
+from .codec import JsonCodec, LazyResponse, OrjsonCodec, get_codec
+from .timing import RequestTiming, TimingRecorder
+from .loop_monitor import LoopLagMonitor, StallEvent
+from .account_pool import Account, AccountPool
 from .auth import Authentication
 from .comments import Comments
 from .feeds import Feeds
@@ -17,6 +28,25 @@ from .utils import Utils
 
 __all__ = [
     'AsyncRequestFramework',
+    'SessionPool',
+    'ConcurrencyLimiter',
+    'AdaptiveConcurrency',
+    'RateLimiter',
+    'RateRule',
+    'RetryPolicy',
+    'RetryBudget',
+    'SingleFlight',
+    'ResponseCache',
+    'JsonCodec',
+    'OrjsonCodec',
+    'LazyResponse',
+    'get_codec',
+    'TimingRecorder',
+    'RequestTiming',
+    'LoopLagMonitor',
+    'StallEvent',
+    'AccountPool',
+    'Account',
     'Authentication',
     'Comments',
     'Feeds',
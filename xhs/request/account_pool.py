@@ -0,0 +1,350 @@
+import asyncio
+import inspect
+import random
+import time
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+
+from loguru import logger
+
+from .adaptive import CAPTCHA_HEADERS, THROTTLE_CODES, THROTTLE_STATUSES
+
+# 账号维度的请求结果
+OK = "ok"
+RISK = "risk"
+INVALID = "invalid"
+
+# 接口返回的业务码: -100 登录已过期
+INVALID_CODES = frozenset((-100,))
+
+LRU = "lru"
+HEALTH = "health"
+
+
+def classify_account(status: int = None, headers=None, payload=None) -> str:
+    """
+    从账号的角度判断请求结果
+
+    Args:
+        status: HTTP状态码
+        headers: 响应头
+        payload: 解析后的响应内容
+    Returns:
+        OK / RISK(限流、验证码、风控业务码) / INVALID(登录失效) 网络错误与账号无关 不应调用
+    """
+    if status in THROTTLE_STATUSES:
+        return RISK
+    if headers is not None and any(name in headers for name in CAPTCHA_HEADERS):
+        return RISK
+    if isinstance(payload, Mapping):
+        code = payload.get("code")
+        if code in THROTTLE_CODES:
+            return RISK
+        if code in INVALID_CODES:
+            return INVALID
+    return OK
+
+
+def parse_cookie(cookie) -> dict:
+    """
+    解析 Cookie
+
+    Args:
+        cookie: "a1=...; web_session=..." 形式的字符串 或 dict
+    Returns:
+        dict
+    """
+    if isinstance(cookie, Mapping):
+        return dict(cookie)
+    result = {}
+    for pair in (cookie or "").split(';'):
+        if '=' in pair:
+            key, value = pair.strip().split('=', 1)
+            result[key] = value
+    return result
+
+
+class Account:
+    """
+    账号池中的一个账号
+
+    Attributes:
+        name: 账号标识 默认为 a1
+        cookie: Cookie dict 直接作为 send_http_request 的 cookie 传入
+        health: 健康度 0~1 成功时上升 触发风控时下降
+        valid: 最近一次校验的结果 None 表示尚未校验 False 的账号不会被选中
+    """
+
+    __slots__ = ('name', 'cookie', 'health', 'valid', 'in_use', 'last_used', 'cooldown_until', 'risk_streak',
+                 'requests', 'risks', 'last_validated')
+
+    def __init__(self, cookie, name: str = None):
+        self.cookie = parse_cookie(cookie)
+        self.name = name or self.cookie.get("a1") or str(id(self))
+        self.health = 1.0
+        self.valid = None
+        self.in_use = 0
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        self.risk_streak = 0
+        self.requests = 0
+        self.risks = 0
+        self.last_validated = 0.0
+
+    @property
+    def a1(self) -> str:
+        return self.cookie.get("a1")
+
+    @property
+    def web_session(self) -> str:
+        return self.cookie.get("web_session")
+
+    @property
+    def cookie_string(self) -> str:
+        return "; ".join(f"{key}={value}" for key, value in self.cookie.items())
+
+    def cooling(self, now: float = None) -> bool:
+        return self.cooldown_until > (time.monotonic() if now is None else now)
+
+    def usable(self, now: float = None) -> bool:
+        return self.valid is not False and not self.cooling(now)
+
+    def __repr__(self):
+        return f"<Account {self.name} health={self.health:.2f} valid={self.valid}>"
+
+
+class AccountPool:
+    """
+    多账号池
+
+    每个请求从池中选择一个账号: LRU 选择最久未使用的账号, HEALTH 按健康度加权随机选择。
+    请求触发限流、验证码或风控业务码时账号进入冷却, 连续触发时冷却时间加倍; 登录失效的账号不再被选中,
+    直到后台校验(Authentication.verify_cookie)重新确认其有效。所有账号都在冷却时 acquire 等待最早结束的冷却
+
+    配合 AsyncRequestFramework(account_pool=...) 使用时, 未传入 cookie 的请求自动从池中取账号
+
+    Args:
+        accounts: 初始账号 Cookie 字符串、dict 或 Account
+        strategy: LRU 或 HEALTH
+        cooldown: 第一次触发风控时的冷却时间(秒)
+        max_cooldown: 冷却时间上限(秒)
+        alpha: 健康度的更新系数 0~1
+        min_weight: HEALTH 策略下账号的最小权重 避免健康度低的账号永远不被选中而无法恢复
+        on_invalid: 可选回调 账号失效时以 Account 调用 可以是普通函数或协程函数 用于重新登录等
+    """
+
+    def __init__(self, accounts=(), strategy: str = LRU, cooldown: float = 300.0, max_cooldown: float = 3600.0,
+                 alpha: float = 0.2, min_weight: float = 0.05, on_invalid=None):
+        if strategy not in (LRU, HEALTH):
+            raise ValueError(f"未知的账号选择策略: {strategy}")
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self.min_weight = min_weight
+        self.on_invalid = on_invalid
+        self._accounts: dict = {}
+        self._validator = None
+        self._callbacks: set = set()
+        for account in accounts:
+            self.add(account)
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __iter__(self):
+        return iter(list(self._accounts.values()))
+
+    def add(self, account, name: str = None) -> Account:
+        """
+        添加账号 同名账号会被替换
+
+        Args:
+            account: Cookie 字符串、dict 或 Account
+            name: 账号标识 默认为 a1
+        Returns:
+            Account
+        """
+        if not isinstance(account, Account):
+            account = Account(account, name)
+        self._accounts[account.name] = account
+        return account
+
+    def remove(self, name: str):
+        self._accounts.pop(name, None)
+
+    def get(self, name: str) -> Account:
+        return self._accounts.get(name)
+
+    def _choose(self, candidates: list) -> Account:
+        if self.strategy == LRU:
+            return min(candidates, key=lambda account: (account.in_use, account.last_used))
+        weights = [max(self.min_weight, account.health) for account in candidates]
+        return random.choices(candidates, weights)[0]
+
+    async def acquire(self) -> Account:
+        """
+        选择一个账号 所有账号都在冷却时等待
+
+        Returns:
+            Account 使用完毕后调用 release
+        Raises:
+            RuntimeError: 池中没有有效的账号
+        """
+        while True:
+            account = self.try_acquire()
+            if account is not None:
+                return account
+            now = time.monotonic()
+            waiting = [account.cooldown_until for account in self._accounts.values() if account.valid is not False]
+            if not waiting:
+                raise RuntimeError("账号池中没有有效的账号")
+            await asyncio.sleep(max(0.0, min(waiting) - now))
+
+    def try_acquire(self, exclude: Account = None) -> Account:
+        """
+        选择一个账号 不等待
+
+        Args:
+            exclude: 不选择的账号 如刚触发风控的账号
+        Returns:
+            Account 没有可用的账号时返回 None
+        """
+        now = time.monotonic()
+        candidates = [account for account in self._accounts.values()
+                      if account is not exclude and account.usable(now)]
+        if not candidates:
+            return None
+        account = self._choose(candidates)
+        account.in_use += 1
+        account.requests += 1
+        account.last_used = now
+        return account
+
+    def release(self, account: Account):
+        account.in_use = max(0, account.in_use - 1)
+
+    @asynccontextmanager
+    async def account(self):
+        """
+        async with pool.account() as account: 取出账号 退出时归还
+        """
+        account = await self.acquire()
+        try:
+            yield account
+        finally:
+            self.release(account)
+
+    def report(self, account: Account, outcome: str):
+        """
+        记录账号的一次请求结果
+
+        Args:
+            account: 账号
+            outcome: classify_account 的结果
+        """
+        if outcome == OK:
+            account.health += self.alpha * (1.0 - account.health)
+            account.risk_streak = 0
+        elif outcome == RISK:
+            account.health -= self.alpha * account.health
+            duration = min(self.max_cooldown, self.cooldown * 2 ** account.risk_streak)
+            account.risk_streak += 1
+            account.risks += 1
+            account.cooldown_until = time.monotonic() + duration
+            logger.warning(f"账号 {account.name} 触发风控 冷却 {duration:.1f}s")
+        elif outcome == INVALID:
+            self._invalidate(account)
+
+    def _invalidate(self, account: Account):
+        if account.valid is False:
+            return
+        account.valid = False
+        logger.warning(f"账号 {account.name} 登录已失效")
+        if self.on_invalid is not None:
+            try:
+                result = self.on_invalid(account)
+                if inspect.isawaitable(result):
+                    # 保留任务的引用 避免执行过程中被垃圾回收
+                    task = asyncio.ensure_future(result)
+                    self._callbacks.add(task)
+                    task.add_done_callback(self._callbacks.discard)
+            except Exception as e:
+                logger.opt(exception=e).warning("on_invalid 回调出错")
+
+    async def validate(self, authentication, accounts=None) -> dict:
+        """
+        通过 Authentication.verify_cookie 校验账号
+
+        Args:
+            authentication: Authentication 实例
+            accounts: 要校验的账号 默认为全部
+        Returns:
+            {name: 是否有效} 无法判断的账号不在结果中
+        """
+        result = {}
+        for account in list(accounts or self._accounts.values()):
+            try:
+                valid = await authentication.verify_cookie(account.cookie_string)
+            except Exception as e:
+                logger.opt(exception=e).warning(f"校验账号 {account.name} 出错")
+                continue
+            if valid is None:
+                # 网络错误等无法判断 保持原状态 等待下一轮校验
+                logger.warning(f"校验账号 {account.name} 失败 保持原状态")
+                continue
+            account.last_validated = time.monotonic()
+            if valid:
+                account.valid = True
+            else:
+                self._invalidate(account)
+            result[account.name] = valid
+        return result
+
+    def start_validation(self, authentication, interval: float = 600.0):
+        """
+        在后台定期校验所有账号 失效的账号在重新校验通过后恢复使用
+
+        Args:
+            authentication: Authentication 实例
+            interval: 两轮校验之间的间隔(秒)
+        """
+        if self._validator is not None and not self._validator.done():
+            return
+        self._validator = asyncio.ensure_future(self._validate_forever(authentication, interval))
+
+    async def _validate_forever(self, authentication, interval: float):
+        while True:
+            await self.validate(authentication)
+            await asyncio.sleep(interval)
+
+    async def close(self):
+        """停止后台校验"""
+        if self._validator is not None:
+            self._validator.cancel()
+            try:
+                await self._validator
+            except asyncio.CancelledError:
+                pass
+            self._validator = None
+
+    def stats(self) -> dict:
+        """
+        各账号的状态
+
+        Returns:
+            {name: {"health", "valid", "in_use", "cooling", "cooldown_remaining", "requests", "risks"}}
+        """
+        now = time.monotonic()
+        return {
+            account.name: {
+                "health": account.health,
+                "valid": account.valid,
+                "in_use": account.in_use,
+                "cooling": account.cooling(now),
+                "cooldown_remaining": max(0.0, account.cooldown_until - now),
+                "requests": account.requests,
+                "risks": account.risks,
+            }
+            for account in self._accounts.values()
+        }
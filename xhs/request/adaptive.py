@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Mapping
+
+from curl_cffi.requests.exceptions import Timeout
+from loguru import logger
+
+from .concurrency import ConcurrencyLimiter
+
+# 限流或风控: 429 请求过多 461/471 需要验证码
+THROTTLE_STATUSES = frozenset((429, 461, 471))
+# 响应头中出现这些字段说明触发了验证码
+CAPTCHA_HEADERS = ("verifytype", "verifyuuid")
+# 接口返回的业务码: 300012 IP存在风险 300013 访问频次异常
+THROTTLE_CODES = frozenset((300012, 300013))
+
+OK = "ok"
+ERROR = "error"
+THROTTLED = "throttled"
+
+
+def classify(status: int = None, headers=None, payload=None, error: BaseException = None) -> str:
+    """
+    根据请求结果判断是否需要降低并发
+
+    Args:
+        status: HTTP状态码
+        headers: 响应头
+        payload: 解析后的响应内容
+        error: 请求过程中抛出的异常
+    Returns:
+        OK / ERROR / THROTTLED 超时、限流与验证码均视为 THROTTLED
+    """
+    if error is not None:
+        return THROTTLED if isinstance(error, (Timeout, asyncio.TimeoutError)) else ERROR
+    if status in THROTTLE_STATUSES:
+        return THROTTLED
+    if headers is not None and any(name in headers for name in CAPTCHA_HEADERS):
+        return THROTTLED
+    if isinstance(payload, Mapping) and payload.get("code") in THROTTLE_CODES:
+        return THROTTLED
+    if status is not None and status >= 500:
+        return ERROR
+    return OK
+
+
+class HostWindow:
+    """单个域名的并发窗口与最近的延迟、错误样本"""
+
+    __slots__ = ('window', 'max_window', 'latencies', 'outcomes', 'since_adjust', 'last_decrease',
+                 'increases', 'decreases', 'last_reason')
+
+    def __init__(self, window: float, max_window: float, samples: int):
+        self.window = window
+        self.max_window = max_window
+        self.latencies: deque = deque(maxlen=samples)
+        self.outcomes: deque = deque(maxlen=samples)
+        self.since_adjust = 0
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.last_reason = ""
+
+    def p95(self) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for outcome in self.outcomes if outcome != OK) / len(self.outcomes)
+
+
+class AdaptiveConcurrency:
+    """
+    基于 AIMD 的自适应并发控制 每个域名一个窗口
+
+    每完成一个窗口大小的请求 若 p95 延迟与错误率都在预算内 窗口加 increase (加性增);
+    超出预算 或遇到超时、429、461、验证码时 窗口乘以 decrease (乘性减), 两次减小之间至少间隔 cooldown 秒。
+    窗口通过 ConcurrencyLimiter.set_limit 生效
+
+    Args:
+        limiter: 要调整的并发限制器
+        latency_budget: p95 延迟预算(秒)
+        error_budget: 错误率预算 0~1
+        min_limit: 窗口下限
+        max_limit: 窗口上限 默认为初始并发数的4倍
+        increase: 每次加性增的大小
+        decrease: 乘性减的系数
+        cooldown: 两次减小之间的最短间隔(秒)
+        samples: 计算 p95 与错误率使用的最近样本数
+    """
+
+    def __init__(self, limiter: ConcurrencyLimiter, latency_budget: float = 2.0, error_budget: float = 0.05,
+                 min_limit: int = 1, max_limit: int = None, increase: float = 1.0, decrease: float = 0.5,
+                 cooldown: float = 1.0, samples: int = 100):
+        self.limiter = limiter
+        self.latency_budget = latency_budget
+        self.error_budget = error_budget
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.samples = samples
+        self._hosts: dict = {}
+
+    def _host(self, host: str) -> HostWindow:
+        state = self._hosts.get(host)
+        if state is None:
+            initial = self.limiter.gate(host).limit or self.limiter.global_gate.limit or 16
+            state = self._hosts[host] = HostWindow(
+                float(initial), float(self.max_limit or initial * 4), self.samples)
+        return state
+
+    def record(self, host: str, latency: float, outcome: str):
+        """
+        记录一次请求的结果 并在需要时调整该域名的并发窗口
+
+        Args:
+            host: 域名
+            latency: 请求耗时(秒)
+            outcome: classify 的结果
+        """
+        state = self._host(host)
+        state.latencies.append(latency)
+        state.outcomes.append(outcome)
+        state.since_adjust += 1
+
+        if outcome == THROTTLED:
+            self._decrease(host, state, "throttled")
+            return
+        if state.since_adjust < max(1, int(state.window)):
+            return
+
+        p95 = state.p95()
+        error_rate = state.error_rate()
+        if p95 > self.latency_budget:
+            self._decrease(host, state, f"p95 {p95:.3f}s")
+        elif error_rate > self.error_budget:
+            self._decrease(host, state, f"error_rate {error_rate:.2%}")
+        elif state.window < state.max_window:
+            state.window = min(state.max_window, state.window + self.increase)
+            state.since_adjust = 0
+            state.increases += 1
+            state.last_reason = "increase"
+            self._apply(host, state)
+        else:
+            state.since_adjust = 0
+
+    def _decrease(self, host: str, state: HostWindow, reason: str):
+        now = time.monotonic()
+        state.since_adjust = 0
+        if now - state.last_decrease < self.cooldown:
+            return
+        state.last_decrease = now
+        state.window = max(float(self.min_limit), state.window * self.decrease)
+        state.decreases += 1
+        state.last_reason = reason
+        logger.warning(f"{host} 并发窗口降为 {int(state.window)} ({reason})")
+        self._apply(host, state)
+
+    def _apply(self, host: str, state: HostWindow):
+        self.limiter.set_limit(host, max(self.min_limit, int(state.window)))
+
+    def stats(self) -> dict:
+        """
+        各域名的窗口状态
+
+        Returns:
+            {host: {"window", "limit", "p95", "error_rate", "increases", "decreases", "last_reason"}}
+        """
+        return {
+            host: {
+                "window": state.window,
+                "limit": int(state.window),
+                "p95": state.p95(),
+                "error_rate": state.error_rate(),
+                "increases": state.increases,
+                "decreases": state.decreases,
+                "last_reason": state.last_reason,
+            }
+            for host, state in self._hosts.items()
+        }
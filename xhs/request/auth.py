@@ -1,4 +1,8 @@
-from typing import Dict
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+from .account_pool import INVALID_CODES
+from .adaptive import THROTTLE_CODES
 
 
 class Authentication:
@@ -134,12 +138,13 @@ class Authentication:
         )
         return response
 
-    async def verify_cookie(self, cookie: str) -> bool:
+    async def verify_cookie(self, cookie: str) -> Optional[bool]:
         """验证cookie是否有效
         Args:
             cookie: cookie字符串
         Returns:
-            bool: True表示有效,False表示无效
+            Optional[bool]: True表示有效,False表示无效(success 为 False 或登录已过期),
+                None表示网络错误、空响应或触发风控 无法判断
         """
         uri = "/api/sns/web/v1/user/selfinfo"
         try:
@@ -148,9 +153,17 @@ class Authentication:
                 method="GET",
                 cookie=self._parse_cookie(cookie)
             )
-            return True if response else False
         except Exception:
+            return None
+        # 请求失败时 send_http_request 返回空dict 与 Cookie 是否有效无关
+        if not isinstance(response, Mapping) or not response:
+            return None
+        code = response.get("code")
+        if code in THROTTLE_CODES:
+            return None
+        if code in INVALID_CODES or response.get("success") is False:
             return False
+        return True if response.get("success") is True else None
 
     def _parse_cookie(self, cookie: str) -> Dict:
         """解析cookie字符串为字典
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+
+# 各接口默认的缓存时间(秒) 按URI通配符匹配 未列出的接口不缓存
+DEFAULT_TTLS = {
+    "/api/sns/web/v1/user/otherinfo": 300,  # UserApi.get_user_info
+    "/explore/*": 300,  # 笔记详情页
+}
+
+
+def cache_key(key) -> str:
+    """把 request_key 的结果转为字符串键"""
+    if isinstance(key, str):
+        return key
+    return hashlib.sha1(json.dumps(list(key), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SqliteTier:
+    """
+    SQLite 磁盘缓存 进程重启后仍然有效
+
+    读写在线程池中执行, 连接由锁保护
+
+    Args:
+        path: 数据库文件路径
+        purge_every: 每写入多少次清理一次过期数据
+    """
+
+    def __init__(self, path: str, purge_every: int = 1000):
+        self.path = path
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS response_cache "
+                           "(key TEXT PRIMARY KEY, expires REAL NOT NULL, body BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_sync(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT expires, body FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] <= time.time():
+            return None
+        return row[0], bytes(row[1])
+
+    def set_sync(self, key: str, expires: float, body: bytes):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?)", (key, expires, body))
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._conn.execute("DELETE FROM response_cache WHERE expires <= ?", (time.time(),))
+            self._conn.commit()
+
+    def clear_sync(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def get(self, key: str):
+        return await asyncio.to_thread(self.get_sync, key)
+
+    async def set(self, key: str, expires: float, body: bytes):
+        await asyncio.to_thread(self.set_sync, key, expires, body)
+
+
+class ResponseCache:
+    """
+    带过期时间的响应缓存
+
+    内存层为按字节数限制大小的LRU, 可选的 SQLite 磁盘层在进程重启后仍然有效;
+    缓存的是响应的原始字节, 每次命中都重新解码, 调用方拿到的对象互不影响
+
+    Args:
+        ttls: {URI通配符: 缓存秒数} 默认为 DEFAULT_TTLS
+        default_ttl: 未匹配任何规则的接口的缓存时间 默认为 None 即不缓存
+        max_bytes: 内存层最多占用的字节数
+        path: 可选 SQLite 数据库路径 传入时启用磁盘层
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = None, max_bytes: int = 32 << 20, path: str = None):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.disk = SqliteTier(path) if path else None
+        self._memory: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def ttl_for(self, uri: str):
+        """
+        uri 对应的缓存时间
+
+        Returns:
+            秒数 不缓存时为None
+        """
+        ttl = self.ttls.get(uri)
+        if ttl is None:
+            ttl = next((value for pattern, value in self.ttls.items() if fnmatchcase(uri, pattern)),
+                       self.default_ttl)
+        return ttl or None
+
+    async def get(self, key):
+        """
+        读取缓存
+
+        Args:
+            key: request_key 的结果或字符串
+        Returns:
+            缓存的响应字节 未命中时为None
+        """
+        key = cache_key(key)
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._remove(key)
+            self.expirations += 1
+
+        if self.disk is not None:
+            entry = await self.disk.get(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._put_memory(key, *entry)
+                return entry[1]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key, body: bytes, ttl: float):
+        """
+        写入缓存
+
+        Args:
+            key: request_key 的结果或字符串
+            body: 响应的原始字节
+            ttl: 缓存秒数
+        """
+        key = cache_key(key)
+        expires = time.time() + ttl
+        self._put_memory(key, expires, body)
+        if self.disk is not None:
+            await self.disk.set(key, expires, body)
+
+    def _put_memory(self, key: str, expires: float, body: bytes):
+        if key in self._memory:
+            self._remove(key)
+        if len(body) > self.max_bytes:
+            return
+        self._memory[key] = (expires, body)
+        self.bytes += len(body)
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._memory)))
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, body = self._memory.pop(key)
+        self.bytes -= len(body)
+
+    async def clear(self):
+        self._memory.clear()
+        self.bytes = 0
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.clear_sync)
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
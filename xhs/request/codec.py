@@ -0,0 +1,141 @@
+import json
+from collections.abc import Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec:
+    """
+    标准库 json 编解码
+
+    dumps 输出紧凑格式且保留非ASCII字符的UTF-8 bytes 与签名使用的
+    json.dumps(separators=(',', ':'), ensure_ascii=False) 一致
+    """
+
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data)
+
+    @property
+    def decode_error(self) -> tuple:
+        """loads 解析失败时抛出的异常类型"""
+        return (json.JSONDecodeError, UnicodeDecodeError)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    orjson 编解码 输出格式与 JsonCodec 相同
+
+    orjson 不支持的对象(非字符串键、超过64位的整数等)回退到标准库
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("未安装 orjson: pip install orjson")
+
+    def dumps(self, obj) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    @property
+    def decode_error(self) -> tuple:
+        return (orjson.JSONDecodeError,)
+
+
+class LazyResponse(Mapping):
+    """
+    延迟解析的 JSON 响应
+
+    保存响应的原始字节, 第一次读取字段时才整体解析, 只关心状态码或直接转存原始数据时不产生解析开销。
+    行为与只读 dict 相同(get、[]、in、遍历), 需要可修改的 dict 时调用 json()
+
+    Args:
+        raw: 响应体原始字节
+        codec: 解析使用的编解码器 默认为 get_codec()
+    """
+
+    __slots__ = ('raw', 'codec', '_data')
+
+    def __init__(self, raw: bytes, codec: JsonCodec = None):
+        self.raw = raw
+        self.codec = codec or get_codec()
+        self._data = None
+
+    @property
+    def loaded(self) -> bool:
+        """是否已经解析"""
+        return self._data is not None
+
+    @property
+    def data(self) -> dict:
+        """解析后的对象 解析失败时抛出 codec.decode_error"""
+        if self._data is None:
+            self._data = self.codec.loads(self.raw)
+        return self._data
+
+    def json(self) -> dict:
+        """解析后的对象"""
+        return self.data
+
+    @property
+    def text(self) -> str:
+        return self.raw.decode('utf-8', errors='replace')
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __repr__(self):
+        if self._data is None:
+            return f"<LazyResponse {len(self.raw)} bytes>"
+        return f"<LazyResponse {self._data!r}>"
+
+
+CODECS = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+}
+
+
+def get_codec(codec=None) -> JsonCodec:
+    """
+    获取 JSON 编解码器
+
+    Args:
+        codec: 编解码器实例 或名称 "json" / "orjson" 默认为 None 即安装了 orjson 时使用 orjson
+    Returns:
+        JsonCodec
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        codec = OrjsonCodec.name if orjson is not None else JsonCodec.name
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError(f"未知的JSON编解码器: {codec}") from None
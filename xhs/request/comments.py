@@ -1,10 +1,21 @@
-import asyncio
 from typing import Dict, Optional
 
+from .rate_limit import RateLimiter
+
 
 class Comments:
-    def __init__(self, client):
+    def __init__(self, client, rate_limiter: RateLimiter = None, a1: str = None):
+        """初始化评论类
+
+        Args:
+            client: 发送请求的客户端
+            rate_limiter: 评论翻页使用的限速器 默认为 RateLimiter() 即 rate_limit.DEFAULT_RULES
+                与 AsyncRequestFramework 共用时传入 arf.rate_limiter
+            a1: 当前账号 Cookies 中的 a1 用于按账号限速
+        """
         self.client = client
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.a1 = a1
 
     async def get_comments(self, note_id: str, cursor: str = "") -> Dict:
         """获取笔记评论列表
@@ -18,6 +29,7 @@ class Comments:
         """
         uri = "/api/sns/web/v2/comment/page"
         params = {"note_id": note_id, "cursor": cursor}
+        await self.rate_limiter.acquire(self.a1, uri)
         return await self.client.get(uri, params)
 
     async def get_sub_comments(self,
@@ -43,6 +55,7 @@ class Comments:
             "num": num,
             "cursor": cursor
         }
+        await self.rate_limiter.acquire(self.a1, uri)
         return await self.client.get(uri, params)
 
     async def create_comment(self,
@@ -149,14 +162,13 @@ class Comments:
         }
         return await self.client.post(uri, data)
 
-    async def get_all_comments(self,
-                               note_id: str,
-                               crawl_interval: int = 1) -> list:
+    async def get_all_comments(self, note_id: str) -> list:
         """获取笔记所有评论(包括子评论)
 
+        翻页节奏由 rate_limiter 控制(默认每个账号每秒1页 见 rate_limit.DEFAULT_RULES) 不再固定等待
+
         Args:
             note_id: 笔记ID
-            crawl_interval: 爬取间隔(秒)
 
         Returns:
             所有评论列表
@@ -194,8 +206,4 @@ class Comments:
                     sub_comment_cursor = sub_comments_res["cursor"]
                     result.extend(sub_comments)
 
-                    await asyncio.sleep(crawl_interval)
-
-            await asyncio.sleep(crawl_interval)
-
         return result
\ No newline at end of file
@@ -0,0 +1,203 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+# 各域名默认的最大并发数 未列出的域名使用 default_host_limit
+DEFAULT_HOST_LIMITS = {
+    "edith.xiaohongshu.com": 16,
+    "www.xiaohongshu.com": 8,
+    "creator.xiaohongshu.com": 8,
+    "ros-upload.xiaohongshu.com": 4,
+    "picasso-static.xiaohongshu.com": 32,
+}
+
+
+class Gate:
+    """
+    可在运行时调整上限的先进先出信号量
+
+    asyncio.Semaphore 创建后无法修改上限, 这里用等待队列实现, 调大上限时立即唤醒排队的请求,
+    调小上限时已经在执行的请求不受影响, 新请求等到并发数降到上限以下
+
+    Args:
+        limit: 最大并发数 None 表示不限制
+    """
+
+    def __init__(self, limit: int = None):
+        self.limit = limit
+        self.active = 0
+        self._waiters: deque = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _has_room(self) -> bool:
+        return self.limit is None or self.active < self.limit
+
+    async def acquire(self):
+        if not self._waiters and self._has_room():
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已经分配到名额后才被取消 归还名额
+                self.release()
+            elif future in self._waiters:
+                self._waiters.remove(future)
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def set_limit(self, limit: int = None):
+        self.limit = limit
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._has_room():
+            future = self._waiters.popleft()
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+
+
+class HostStats:
+    """单个域名的排队与网络耗时统计 单位为秒"""
+
+    __slots__ = ('requests', 'queue_wait_total', 'queue_wait_max', 'network_time_total', 'network_time_max')
+
+    def __init__(self):
+        self.requests = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.network_time_total = 0.0
+        self.network_time_max = 0.0
+
+    def record(self, queue_wait: float, network_time: float):
+        self.requests += 1
+        self.queue_wait_total += queue_wait
+        self.network_time_total += network_time
+        if queue_wait > self.queue_wait_max:
+            self.queue_wait_max = queue_wait
+        if network_time > self.network_time_max:
+            self.network_time_max = network_time
+
+    def to_dict(self) -> dict:
+        count = self.requests or 1
+        return {
+            "requests": self.requests,
+            "queue_wait_avg": self.queue_wait_total / count,
+            "queue_wait_max": self.queue_wait_max,
+            "network_time_avg": self.network_time_total / count,
+            "network_time_max": self.network_time_max,
+        }
+
+
+class RequestSlot:
+    """一次请求占用的并发名额 记录排队时间与持有名额期间(即网络请求)的时间"""
+
+    __slots__ = ('host', 'queue_wait', 'network_time', '_started')
+
+    def __init__(self, host: str, queue_wait: float):
+        self.host = host
+        self.queue_wait = queue_wait
+        self.network_time = 0.0
+        self._started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """占用名额至今的时间 归还名额后即为 network_time"""
+        return self.network_time or time.perf_counter() - self._started
+
+
+class ConcurrencyLimiter:
+    """
+    按域名与全局限制同时进行中的请求数量
+
+    先占用域名名额再占用全局名额, 某个域名排队时不会占着全局名额不放
+
+    Args:
+        global_limit: 全局最大并发数 None 表示不限制
+        host_limits: 各域名的最大并发数 与 DEFAULT_HOST_LIMITS 合并
+        default_host_limit: 未配置域名的最大并发数 None 表示不限制
+    """
+
+    def __init__(self, global_limit: int = 64, host_limits: dict = None, default_host_limit: int = 16):
+        self.host_limits = {**DEFAULT_HOST_LIMITS, **(host_limits or {})}
+        self.default_host_limit = default_host_limit
+        self.global_gate = Gate(global_limit)
+        self._gates: dict = {}
+        self._stats: dict = {}
+
+    def gate(self, host: str) -> Gate:
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = Gate(self.host_limits.get(host, self.default_host_limit))
+        return gate
+
+    def set_limit(self, host: str, limit: int = None):
+        """
+        修改域名的最大并发数 立即生效
+
+        Args:
+            host: 域名
+            limit: 最大并发数 None 表示不限制
+        """
+        self.host_limits[host] = limit
+        self.gate(host).set_limit(limit)
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        等待并占用url所在域名与全局的并发名额
+
+        Args:
+            url: 请求的完整URL
+        Returns:
+            RequestSlot 退出上下文后 network_time 为持有名额的时间
+        """
+        host = urlsplit(url).hostname or ""
+        gate = self.gate(host)
+        start = time.perf_counter()
+        await gate.acquire()
+        try:
+            await self.global_gate.acquire()
+        except BaseException:
+            gate.release()
+            raise
+
+        slot = RequestSlot(host, time.perf_counter() - start)
+        try:
+            yield slot
+        finally:
+            slot.network_time = time.perf_counter() - slot._started
+            self.global_gate.release()
+            gate.release()
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = self._stats[host] = HostStats()
+            stats.record(slot.queue_wait, slot.network_time)
+
+    def stats(self) -> dict:
+        """
+        各域名的并发与耗时统计
+
+        Returns:
+            {host: {"limit", "in_flight", "waiting", "requests", "queue_wait_avg", ...}, "global": {...}}
+        """
+        result = {}
+        for host, gate in self._gates.items():
+            stats = self._stats.get(host) or HostStats()
+            result[host] = {"limit": gate.limit, "in_flight": gate.active, "waiting": gate.waiting,
+                            **stats.to_dict()}
+        result["global"] = {"limit": self.global_gate.limit, "in_flight": self.global_gate.active,
+                            "waiting": self.global_gate.waiting}
+        return result
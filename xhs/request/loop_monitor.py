@@ -0,0 +1,195 @@
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+import traceback
+
+from loguru import logger
+
+from .timing import DEFAULT_BUCKETS, Histogram
+
+# 事件循环自身的栈帧 定位阻塞位置时跳过
+_LOOP_INTERNALS = (f"{os.sep}asyncio{os.sep}", f"{os.sep}selectors.py", f"{os.sep}threading.py")
+
+
+def _internal(filename: str) -> bool:
+    return any(part in filename for part in _LOOP_INTERNALS)
+
+
+class StallEvent:
+    """
+    一次事件循环阻塞
+
+    Attributes:
+        duration: 阻塞时长(秒)
+        task: 阻塞时正在运行的任务 如 "Task-12 Notes.get_note_detail" 未知时为None
+        site: 阻塞位置 最内层的非 asyncio 栈帧 "文件:行号 函数名" 未捕获到时为 "unknown"
+        stack: 阻塞期间捕获的调用栈 由外到内 未捕获到时为空
+    """
+
+    __slots__ = ('duration', 'task', 'site', 'stack')
+
+    def __init__(self, duration: float, task: str = None, site: str = "unknown", stack: list = None):
+        self.duration = duration
+        self.task = task
+        self.site = site
+        self.stack = stack or []
+
+    def __repr__(self):
+        return f"<StallEvent {self.duration * 1e3:.1f}ms {self.task} @ {self.site}>"
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控
+
+    每隔 interval 秒在事件循环中调度一次回调, 实际执行时间与计划时间之差即调度延迟, 记入直方图。
+    另有一个守护线程检查心跳, 事件循环超过 threshold 秒没有响应时抓取事件循环线程当前的调用栈与任务,
+    阻塞结束后按阻塞位置汇总, 超过 log_threshold 秒时输出日志
+
+    用于找出签名、验证码识别、HTML 解析等在事件循环中执行的CPU密集操作
+
+    Args:
+        interval: 采样间隔(秒)
+        threshold: 视为阻塞并抓取调用栈的延迟(秒)
+        log_threshold: 输出警告日志的阻塞时长(秒) None 表示不输出
+        on_stall: 可选回调 每次阻塞结束后以 StallEvent 调用 可以是普通函数或协程函数
+        timing: 可选 TimingRecorder 调度延迟与阻塞时长以 endpoint="event_loop", phase="lag"/"stall" 记入
+        max_sites: 最多保留的阻塞位置数量
+        stack_limit: 抓取调用栈的最大深度
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, log_threshold: float = 0.25,
+                 on_stall=None, timing=None, max_sites: int = 100, stack_limit: int = 30):
+        self.interval = interval
+        self.threshold = threshold
+        self.log_threshold = log_threshold
+        self.on_stall = on_stall
+        self.timing = timing
+        self.max_sites = max_sites
+        self.stack_limit = stack_limit
+        self.lag = Histogram(DEFAULT_BUCKETS)
+        self.stalls = 0
+        self.max_stall = 0.0
+        self._sites: dict = {}
+        self._loop = None
+        self._thread_id = None
+        self._handle = None
+        self._watchdog = None
+        self._stop = threading.Event()
+        self._expected = 0.0
+        self._beat = 0.0
+        self._captured = None
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        """在当前(或指定的)事件循环中开始监控 需要在事件循环线程中调用"""
+        if self.running:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat = time.monotonic()
+        self._expected = self._loop.time() + self.interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+        self._watchdog = threading.Thread(target=self._watch, name="xhshow-loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        if self._watchdog is not None and self._watchdog is not threading.current_thread():
+            self._watchdog.join(timeout=1)
+        self._watchdog = None
+
+    def _tick(self):
+        now = self._loop.time()
+        lag = max(0.0, now - self._expected)
+        self._beat = time.monotonic()
+        self.lag.observe(lag)
+        if self.timing is not None:
+            self.timing.observe("event_loop", "lag", lag)
+        captured, self._captured = self._captured, None
+        if lag >= self.threshold:
+            self._report(StallEvent(lag, *captured) if captured else StallEvent(lag))
+        self._expected = now + self.interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _watch(self):
+        period = min(self.interval, self.threshold) / 2
+        captured_beat = None
+        while not self._stop.wait(period):
+            beat = self._beat
+            if beat != captured_beat and time.monotonic() - beat > self.interval + self.threshold:
+                captured_beat = beat
+                self._captured = self._capture()
+
+    def _capture(self) -> tuple:
+        """在守护线程中抓取事件循环线程的调用栈与当前任务"""
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame, limit=self.stack_limit)
+        site = next((f"{entry.filename}:{entry.lineno} {entry.name}" for entry in reversed(stack)
+                     if not _internal(entry.filename)), "unknown")
+        task = asyncio.current_task(self._loop)
+        if task is not None:
+            coro = task.get_coro()
+            task = f"{task.get_name()} {getattr(coro, '__qualname__', coro)}"
+        return task, site, [f"{entry.filename}:{entry.lineno} {entry.name}" for entry in stack]
+
+    def _report(self, event: StallEvent):
+        self.stalls += 1
+        self.max_stall = max(self.max_stall, event.duration)
+        if self.timing is not None:
+            self.timing.observe("event_loop", "stall", event.duration)
+
+        site = self._sites.get(event.site)
+        if site is None:
+            if len(self._sites) >= self.max_sites:
+                self._sites.pop(min(self._sites, key=lambda key: self._sites[key]["total"]))
+            site = self._sites[event.site] = {"site": event.site, "task": event.task, "count": 0,
+                                              "total": 0.0, "max": 0.0, "stack": event.stack}
+        site["count"] += 1
+        site["total"] += event.duration
+        if event.duration >= site["max"]:
+            site["max"] = event.duration
+            site["task"] = event.task or site["task"]
+            site["stack"] = event.stack or site["stack"]
+
+        if self.log_threshold is not None and event.duration >= self.log_threshold:
+            stack = "\n".join(f"    {line}" for line in event.stack[-10:])
+            logger.warning(f"事件循环阻塞 {event.duration * 1e3:.0f}ms 任务 {event.task} 位置 {event.site}"
+                           + (f"\n{stack}" if stack else ""))
+
+        if self.on_stall is not None:
+            try:
+                result = self.on_stall(event)
+                if inspect.isawaitable(result):
+                    self._loop.create_task(result)
+            except Exception as e:
+                logger.opt(exception=e).warning("on_stall 回调出错")
+
+    def stats(self, top: int = 10) -> dict:
+        """
+        监控统计
+
+        Args:
+            top: 返回阻塞总时长最多的前几个位置
+        Returns:
+            {"lag": 调度延迟直方图, "stalls": 阻塞次数, "max_stall": 最长阻塞(秒),
+             "sites": [{"site", "task", "count", "total", "max", "stack"}]}
+        """
+        return {
+            "lag": self.lag.snapshot(),
+            "stalls": self.stalls,
+            "max_stall": self.max_stall,
+            "sites": sorted(self._sites.values(), key=lambda site: site["total"], reverse=True)[:top],
+        }
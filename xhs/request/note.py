@@ -38,11 +38,10 @@ class Notes:
             url=url,
             method="GET",
             params=params,
-            html_mode=True,
-            back_fun=True
+            html_mode=True
         )
 
-        content = (await extract_initial_state(await res.acontent(), replacements)
+        content = (await extract_initial_state(res, replacements)
                    )["note"]["noteDetailMap"][f"{note_id}"]
 
         return content
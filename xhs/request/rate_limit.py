@@ -0,0 +1,221 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from fnmatch import fnmatchcase
+
+# 浮点误差容忍 补充令牌后 0.9999999 视为 1 个令牌
+_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    每秒补充 rate 个令牌, 最多积累 burst 个。令牌不足时 acquire 按调用方(owner)分组排队,
+    令牌到达时在各调用方之间轮流分配, 某个账号一次提交大量请求也不会饿死其他账号。
+    不使用后台任务, 只在有人排队时挂一个 call_later 定时器
+
+    Args:
+        rate: 每秒补充的令牌数
+        burst: 令牌桶容量 即允许的突发请求数
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._queues: OrderedDict = OrderedDict()
+        self._timer = None
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def idle(self, now: float) -> bool:
+        """没有排队且令牌已补满 可以从限速器中回收"""
+        return not self._queues and self.tokens + (now - self.updated) * self.rate >= self.burst
+
+    async def acquire(self, owner=None) -> float:
+        """
+        取出一个令牌 不足时等待
+
+        Args:
+            owner: 调用方标识 如账号a1 同一owner的请求按先后顺序 不同owner之间轮流分配
+        Returns:
+            等待的时间(秒)
+        """
+        start = time.monotonic()
+        self._refill(start)
+        if not self._queues and self.tokens >= 1 - _EPSILON:
+            self.tokens -= 1
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queues.setdefault(owner, deque()).append(future)
+        self._schedule(loop)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已经分到令牌后才被取消 退还令牌
+                self.tokens = min(self.burst, self.tokens + 1)
+            else:
+                self._discard(owner, future)
+            raise
+        return time.monotonic() - start
+
+    def _discard(self, owner, future):
+        queue = self._queues.get(owner)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            if not queue:
+                del self._queues[owner]
+
+    def _schedule(self, loop):
+        if self._timer is None and self._queues:
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+            self._timer = loop.call_later(delay, self._dispatch, loop)
+
+    def _dispatch(self, loop):
+        self._timer = None
+        self._refill(time.monotonic())
+        while self._queues and self.tokens >= 1 - _EPSILON:
+            owner, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            if not future.done():
+                self.tokens -= 1
+                future.set_result(None)
+        self._schedule(loop)
+
+
+class RateRule:
+    """
+    限速规则
+
+    Args:
+        pattern: URI 通配符 如 /api/sns/web/v2/comment/*
+        rate: 每个账号每秒允许的请求数
+        burst: 每个账号允许的突发请求数
+        shared_rate: 可选 所有账号合计每秒允许的请求数 按账号轮流分配
+        shared_burst: 所有账号合计允许的突发请求数 默认与 burst 相同
+    """
+
+    __slots__ = ('pattern', 'rate', 'burst', 'shared_rate', 'shared_burst')
+
+    def __init__(self, pattern: str, rate: float, burst: int = 1, shared_rate: float = None,
+                 shared_burst: int = None):
+        self.pattern = pattern
+        self.rate = rate
+        self.burst = burst
+        self.shared_rate = shared_rate
+        self.shared_burst = shared_burst or burst
+
+    def match(self, uri: str) -> bool:
+        return fnmatchcase(uri, self.pattern)
+
+
+# 评论翻页原先在每页之间固定 sleep 1 秒 这里改为每个账号每秒1个请求 Comments 与 AsyncRequestFramework 均使用
+DEFAULT_RULES = (
+    RateRule("/api/sns/web/v2/comment/*", rate=1.0, burst=1),
+)
+
+
+class RateLimiter:
+    """
+    按 (账号a1, URI规则) 划分令牌桶的限速器
+
+    规则按添加顺序匹配, 第一条匹配的规则生效, 没有匹配的URI不限速。
+    未登录的请求(没有a1)共用一个桶
+
+    Args:
+        rules: RateRule 列表 默认为 DEFAULT_RULES
+        max_buckets: 令牌桶数量超过该值时回收空闲的桶
+    """
+
+    def __init__(self, rules=None, max_buckets: int = 10000):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self.max_buckets = max_buckets
+        self._buckets: dict = {}
+        self._rule_cache: dict = {}
+
+    def add_rule(self, pattern: str, rate: float, burst: int = 1, shared_rate: float = None,
+                 shared_burst: int = None) -> RateRule:
+        """
+        添加限速规则 已存在相同 pattern 时替换
+
+        Returns:
+            RateRule
+        """
+        rule = RateRule(pattern, rate, burst, shared_rate, shared_burst)
+        self.rules = [r for r in self.rules if r.pattern != pattern] + [rule]
+        self._rule_cache.clear()
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if key[1] != pattern}
+        return rule
+
+    def rule_for(self, uri: str):
+        """返回uri匹配的第一条规则 没有则为None"""
+        try:
+            return self._rule_cache[uri]
+        except KeyError:
+            pass
+        rule = next((r for r in self.rules if r.match(uri)), None)
+        if len(self._rule_cache) < 4096:
+            self._rule_cache[uri] = rule
+        return rule
+
+    def _bucket(self, key: tuple, rate: float, burst: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                now = time.monotonic()
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.idle(now)}
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    async def acquire(self, a1: str, uri: str) -> float:
+        """
+        等待发送请求的许可
+
+        先取账号自己的令牌, 再取规则的共享令牌(如果配置了 shared_rate)
+
+        Args:
+            a1: 账号Cookies中的a1 未登录时为None
+            uri: 请求的URI
+        Returns:
+            等待的时间(秒)
+        """
+        rule = self.rule_for(uri)
+        if rule is None:
+            return 0.0
+        waited = await self._bucket((a1, rule.pattern), rule.rate, rule.burst).acquire(a1)
+        if rule.shared_rate:
+            waited += await self._bucket((None, rule.pattern, 'shared'), rule.shared_rate,
+                                         rule.shared_burst).acquire(a1)
+        return waited
+
+    def stats(self) -> dict:
+        """
+        各令牌桶的状态
+
+        Returns:
+            {"a1 pattern": {"tokens", "waiting", "rate", "burst"}}
+        """
+        now = time.monotonic()
+        result = {}
+        for key, bucket in self._buckets.items():
+            name = f"{'shared' if len(key) > 2 else key[0]} {key[1]}"
+            tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            result[name] = {"tokens": tokens, "waiting": bucket.waiting, "rate": bucket.rate, "burst": bucket.burst}
+        return result
@@ -0,0 +1,200 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+from curl_cffi.curl import CurlError
+from curl_cffi.requests.exceptions import ConnectionError as CurlConnectionError
+from curl_cffi.requests.exceptions import ConnectTimeout, DNSError, ProxyError, SSLError, Timeout
+from loguru import logger
+
+# 错误分类
+CONNECT_TIMEOUT = "connect_timeout"
+READ_TIMEOUT = "read_timeout"
+CONNECT = "connect"
+TLS = "tls"
+NETWORK = "network"
+HTTP_STATUS = "http_status"
+OTHER = "other"
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    对请求异常分类
+
+    Args:
+        error: 请求过程中抛出的异常
+    Returns:
+        CONNECT_TIMEOUT / READ_TIMEOUT / CONNECT / TLS / NETWORK / OTHER
+        OTHER 表示与网络无关的异常(通常是代码错误) 不应重试
+    """
+    if isinstance(error, ConnectTimeout):
+        return CONNECT_TIMEOUT
+    if isinstance(error, (Timeout, asyncio.TimeoutError)):
+        return READ_TIMEOUT
+    if isinstance(error, SSLError):
+        return TLS
+    if isinstance(error, (CurlConnectionError, DNSError, ProxyError)):
+        return CONNECT
+    if isinstance(error, CurlError):
+        return NETWORK
+    return OTHER
+
+
+def parse_retry_after(value) -> float:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数 或 HTTP-date
+    Returns:
+        需要等待的秒数 无法解析时为None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    客户端级别的重试预算
+
+    每个请求存入 ratio 个令牌, 每次重试取出 1 个, 另外每秒补充 min_per_second 个保证低流量时也能重试。
+    故障期间重试次数不会超过正常请求数的 ratio 倍, 避免重试放大下游压力
+
+    Args:
+        ratio: 重试占请求的最大比例
+        min_per_second: 每秒至少允许的重试次数
+        max_balance: 最多积累的令牌数 默认为 min_per_second * 10
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_balance: float = None):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance if max_balance is not None else max(1.0, min_per_second * 10)
+        self.balance = self.max_balance
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.max_balance, self.balance + (now - self.updated) * self.min_per_second)
+        self.updated = now
+
+    def on_request(self):
+        self.requests += 1
+        self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def try_retry(self) -> bool:
+        self._refill()
+        if self.balance >= 1:
+            self.balance -= 1
+            self.retries += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "retries": self.retries, "rejected": self.rejected,
+                "balance": self.balance}
+
+
+class RetryPolicy:
+    """
+    请求重试策略
+
+    按错误类型决定是否重试, 等待时间为指数退避加全抖动 random(0, min(max_delay, base_delay * 2 ** n)),
+    响应带 Retry-After 时至少等待其指定的时间; 所有重试都要先从 RetryBudget 取得许可
+
+    Args:
+        max_attempts: 最多尝试次数(包含第一次)
+        base_delay: 退避的基础时间(秒)
+        max_delay: 单次退避的上限(秒)
+        retry_on: 需要重试的错误类型 见 classify_error 与 HTTP_STATUS
+        retry_statuses: 需要重试的HTTP状态码
+        max_retry_after: Retry-After 的上限(秒) 超过时不再重试
+        budget: 重试预算 默认每个策略实例一份
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.1, max_delay: float = 10.0,
+                 retry_on=frozenset((CONNECT_TIMEOUT, READ_TIMEOUT, CONNECT, TLS, NETWORK, HTTP_STATUS)),
+                 retry_statuses=frozenset((429, 500, 502, 503, 504)), max_retry_after: float = 60.0,
+                 budget: RetryBudget = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = frozenset(retry_on)
+        self.retry_statuses = frozenset(retry_statuses)
+        self.max_retry_after = max_retry_after
+        self.budget = budget or RetryBudget()
+
+    def retryable_status(self, status: int) -> bool:
+        return HTTP_STATUS in self.retry_on and status in self.retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次失败后的退避时间(全抖动) attempt 从0开始"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def next_delay(self, attempt: int, kind: str, max_attempts: int = None, retry_after=None):
+        """
+        判断是否重试 并给出等待时间
+
+        Args:
+            attempt: 已经失败的次数减一 即本次尝试的序号 从0开始
+            kind: 错误类型
+            max_attempts: 可选 覆盖本次请求的最多尝试次数
+            retry_after: 响应中的 Retry-After
+        Returns:
+            等待的秒数 不重试时为None
+        """
+        if kind not in self.retry_on:
+            return None
+        if attempt + 1 >= (max_attempts or self.max_attempts):
+            return None
+        delay = self.backoff(attempt)
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            if wait > self.max_retry_after:
+                return None
+            delay = max(delay, wait)
+        if not self.budget.try_retry():
+            return None
+        return delay
+
+
+class ThrottledLog:
+    """
+    限频日志 同一个key在 interval 秒内只输出一次 其余计数 下次输出时附带被省略的条数
+
+    消息以函数形式传入 被省略时不会格式化
+
+    Args:
+        interval: 同一个key两次输出之间的最短间隔(秒)
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._last: dict = {}
+        self._suppressed: dict = {}
+
+    def log(self, level: str, key, message, exception: BaseException = None):
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._last[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        text = message()
+        if suppressed:
+            text = f"{text} (省略了 {suppressed} 条相同日志)"
+        logger.opt(depth=1, exception=exception).log(level, text)
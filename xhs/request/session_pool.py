@@ -0,0 +1,143 @@
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+
+from curl_cffi.requests import AsyncSession
+from loguru import logger
+
+from .timing import CURL_TIMING_INFOS
+
+
+def session_key(proxy=None, impersonate: str = None, verify: bool = True) -> tuple:
+    """
+    计算会话池的键 dict形式的代理转为有序元组
+
+    Args:
+        proxy: 代理 字符串或 {"http": ..., "https": ...}
+        impersonate: curl_cffi 浏览器指纹 如 chrome124 None表示不伪装
+        verify: 是否验证 SSL 证书
+    Returns:
+        (proxy, impersonate, verify)
+    """
+    if isinstance(proxy, Mapping):
+        proxy = tuple(sorted(proxy.items()))
+    return proxy or None, impersonate, bool(verify)
+
+
+class _PooledSession:
+    __slots__ = ('session', 'in_use', 'last_used')
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class SessionPool:
+    """
+    按 (proxy, impersonate, verify) 复用 AsyncSession
+
+    同一个键的请求共用一个会话, curl 连接池中的 TCP/TLS 连接可以复用, 不必每次重新握手。
+    超过 max_size 时关闭最久未使用的空闲会话, 空闲超过 idle_timeout 秒的会话在下一次取用时关闭。
+    会话只能在创建它的事件循环中使用
+
+    Args:
+        max_size: 最多保留的会话数量
+        idle_timeout: 空闲会话的最长保留时间(秒) None表示不按时间回收
+    """
+
+    def __init__(self, max_size: int = 16, idle_timeout: float = 60.0):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._sessions: OrderedDict = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @staticmethod
+    def _new_session(key: tuple) -> AsyncSession:
+        proxy, impersonate, verify = key
+        kwargs = {"verify": verify, "curl_infos": list(CURL_TIMING_INFOS)}
+        if impersonate:
+            kwargs["impersonate"] = impersonate
+        if isinstance(proxy, tuple):
+            kwargs["proxies"] = dict(proxy)
+        elif proxy:
+            kwargs["proxy"] = proxy
+        return AsyncSession(**kwargs)
+
+    def _collect(self, now: float) -> list:
+        """从池中移除过期或超出数量的空闲会话 返回待关闭的会话"""
+        expired = []
+        if self.idle_timeout is not None:
+            for key, entry in list(self._sessions.items()):
+                if not entry.in_use and now - entry.last_used > self.idle_timeout:
+                    expired.append(self._sessions.pop(key).session)
+        if len(self._sessions) > self.max_size:
+            for key, entry in list(self._sessions.items()):
+                if len(self._sessions) <= self.max_size:
+                    break
+                if not entry.in_use:
+                    expired.append(self._sessions.pop(key).session)
+        self.evicted += len(expired)
+        return expired
+
+    @asynccontextmanager
+    async def session(self, proxy=None, impersonate: str = None, verify: bool = True):
+        """
+        取出对应键的会话 不存在时创建
+
+        Args:
+            proxy: 代理 字符串或dict
+            impersonate: curl_cffi 浏览器指纹
+            verify: 是否验证 SSL 证书
+        Returns:
+            AsyncSession 退出上下文后归还 不要手动关闭
+        """
+        key = session_key(proxy, impersonate, verify)
+        entry = self._sessions.get(key)
+        if entry is None:
+            entry = self._sessions[key] = _PooledSession(self._new_session(key))
+            self.created += 1
+        else:
+            self._sessions.move_to_end(key)
+        entry.in_use += 1
+
+        try:
+            yield entry.session
+        finally:
+            entry.in_use -= 1
+            entry.last_used = now = time.monotonic()
+            for session in self._collect(now):
+                await self._close(session)
+
+    @staticmethod
+    async def _close(session: AsyncSession):
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning(f"关闭会话失败 {e}")
+
+    async def close(self):
+        """关闭池中的所有会话"""
+        sessions = [entry.session for entry in self._sessions.values()]
+        self._sessions.clear()
+        for session in sessions:
+            await self._close(session)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._sessions),
+            "in_use": sum(1 for entry in self._sessions.values() if entry.in_use),
+            "created": self.created,
+            "evicted": self.evicted,
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
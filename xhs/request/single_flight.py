@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+
+def _canonical(value) -> str:
+    """参数按键排序后序列化 键顺序不同的相同参数得到同一个结果"""
+    if value is None:
+        return ""
+    if isinstance(value, (str, bytes)):
+        return value if isinstance(value, str) else value.decode('utf-8', errors='replace')
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def request_key(method: str, url: str, params=None, data=None, account: str = None, json_data=None) -> tuple:
+    """
+    计算请求合并使用的键
+
+    Args:
+        method: HTTP 请求方法
+        url: 请求的 URL
+        params: URL 查询参数
+        data: 请求体
+        account: 账号标识 如 Cookies 中的 a1 不同账号的请求不会合并
+        json_data: 以 json 参数传入的请求体
+    Returns:
+        (method, url, params, data, account, json_data)
+    """
+    return method.upper(), url, _canonical(params), _canonical(data), account, _canonical(json_data)
+
+
+class SingleFlight:
+    """
+    合并并发的相同请求
+
+    同一个键同时只有一个请求在执行, 期间到达的相同请求等待它的结果, 所有调用方拿到的是同一个对象, 不要原地修改。
+    请求在独立的任务中执行, 发起者被取消不会影响其他等待者
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self.executed = 0
+        self.shared = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key, fn):
+        """
+        执行 fn 或等待正在执行的相同请求
+
+        Args:
+            key: 请求的键 见 request_key
+            fn: 无参数 返回协程的函数
+        Returns:
+            fn 的结果
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 所有等待者都已取消时 避免 "exception was never retrieved" 警告
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "executed": self.executed, "shared": self.shared}
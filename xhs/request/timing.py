@@ -0,0 +1,264 @@
+import re
+from bisect import bisect_left
+
+from curl_cffi import CurlInfo
+from loguru import logger
+
+# 会话创建时登记的 curl 计时信息 随响应头一起读取 见 Response.infos
+CURL_TIMING_INFOS = (
+    CurlInfo.NAMELOOKUP_TIME,
+    CurlInfo.CONNECT_TIME,
+    CurlInfo.APPCONNECT_TIME,
+    CurlInfo.PRETRANSFER_TIME,
+    CurlInfo.STARTTRANSFER_TIME,
+)
+
+# 直方图默认的桶上界(秒)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 请求的各个阶段
+PHASES = ("sign", "rate_limit", "queue", "dns", "connect", "tls", "ttfb", "download", "decode", "total")
+
+# URI 中的笔记ID、用户ID等路径段 统一替换 避免每个ID一个指标
+_ID_SEGMENT = re.compile(r"/(?:[0-9a-fA-F]{16,}|\d+)(?=/|$)")
+
+
+def endpoint_of(path: str) -> str:
+    """
+    把请求路径归一为接口名
+
+    Args:
+        path: URI 如 /explore/64f1c2...
+    Returns:
+        ID 路径段替换为 {id} 后的路径 如 /explore/{id}
+    """
+    return _ID_SEGMENT.sub("/{id}", path) or "/"
+
+
+def curl_phases(infos: dict) -> dict:
+    """
+    由 curl 的累计计时换算各网络阶段的耗时
+
+    复用连接时 dns/connect/tls 为 0, 明文 HTTP 没有 tls
+
+    Args:
+        infos: Response.infos
+    Returns:
+        {"dns", "connect", "tls", "ttfb"} 缺少计时信息时为空dict
+    """
+    if not infos or CurlInfo.STARTTRANSFER_TIME not in infos:
+        return {}
+    dns = infos[CurlInfo.NAMELOOKUP_TIME]
+    connect = infos[CurlInfo.CONNECT_TIME]
+    tls = infos[CurlInfo.APPCONNECT_TIME]
+    pretransfer = infos[CurlInfo.PRETRANSFER_TIME]
+    return {
+        "dns": dns,
+        "connect": max(0.0, connect - dns),
+        "tls": max(0.0, tls - connect) if tls else 0.0,
+        "ttfb": max(0.0, infos[CurlInfo.STARTTRANSFER_TIME] - pretransfer),
+    }
+
+
+class Histogram:
+    """
+    固定桶直方图 记录一次为一次二分查找与两次加法
+
+    Args:
+        buckets: 升序的桶上界
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """按桶内线性插值估算分位数 落在最后一个桶时返回最大的桶上界"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip((*self.buckets, float('inf')), self.counts)),
+        }
+
+
+class RequestTiming:
+    """
+    一次 send_http_request 的各阶段耗时(秒)
+
+    sign、rate_limit 与 queue 为所有尝试的累计值, 网络各阶段与 download 为最后一次尝试的值,
+    没有经历的阶段为 None; total 包含签名、重试等待在内的全部耗时
+    """
+
+    __slots__ = ('endpoint', 'method', 'status', 'error', 'retries', *PHASES)
+
+    def __init__(self, endpoint: str, method: str):
+        self.endpoint = endpoint
+        self.method = method
+        self.status = None
+        self.error = None
+        self.retries = 0
+        for phase in PHASES:
+            setattr(self, phase, None)
+
+    def add(self, phase: str, seconds: float):
+        current = getattr(self, phase)
+        setattr(self, phase, seconds if current is None else current + seconds)
+
+    def update(self, phases: dict):
+        for phase, seconds in phases.items():
+            setattr(self, phase, seconds)
+
+    def phases(self) -> dict:
+        return {phase: getattr(self, phase) for phase in PHASES if getattr(self, phase) is not None}
+
+    def as_dict(self) -> dict:
+        return {"endpoint": self.endpoint, "method": self.method, "status": self.status, "error": self.error,
+                "retries": self.retries, **self.phases()}
+
+    def __repr__(self):
+        phases = " ".join(f"{phase}={seconds * 1e3:.1f}ms" for phase, seconds in self.phases().items())
+        return f"<RequestTiming {self.method} {self.endpoint} {self.status} {phases}>"
+
+
+class TimingRecorder:
+    """
+    按接口统计请求各阶段耗时
+
+    每个 (接口, 阶段) 一个直方图, 另外按接口统计请求数、重试次数、状态码与错误类型;
+    可导出为 dict 或 Prometheus 文本格式, 也可以注册异步回调逐个接收 RequestTiming
+
+    Args:
+        buckets: 直方图的桶上界(秒)
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: dict = {}
+        self._requests: dict = {}
+        self._retries: dict = {}
+        self._statuses: dict = {}
+        self._hooks: list = []
+
+    def add_hook(self, hook):
+        """
+        注册回调 每个请求结束后以 RequestTiming 调用 回调抛出的异常只记录日志
+
+        Args:
+            hook: async def hook(timing: RequestTiming)
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def observe(self, endpoint: str, phase: str, seconds: float):
+        histogram = self._histograms.get((endpoint, phase))
+        if histogram is None:
+            histogram = self._histograms[(endpoint, phase)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    async def record(self, timing: RequestTiming):
+        """记录一个请求的耗时 并依次调用回调"""
+        endpoint = timing.endpoint
+        for phase in PHASES:
+            seconds = getattr(timing, phase)
+            if seconds is not None:
+                self.observe(endpoint, phase, seconds)
+        self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+        self._retries[endpoint] = self._retries.get(endpoint, 0) + timing.retries
+        outcome = (endpoint, str(timing.status) if timing.error is None else timing.error)
+        self._statuses[outcome] = self._statuses.get(outcome, 0) + 1
+
+        for hook in self._hooks:
+            try:
+                await hook(timing)
+            except Exception as e:
+                logger.opt(exception=e).warning(f"耗时回调 {hook!r} 出错")
+
+    def snapshot(self) -> dict:
+        """
+        当前统计的快照
+
+        Returns:
+            {endpoint: {"requests", "retries", "outcomes": {状态码或错误类型: 次数},
+                        "phases": {phase: Histogram.snapshot()}}}
+        """
+        result = {}
+        for endpoint, requests in self._requests.items():
+            result[endpoint] = {"requests": requests, "retries": self._retries.get(endpoint, 0),
+                                "outcomes": {}, "phases": {}}
+        for (endpoint, outcome), count in self._statuses.items():
+            result[endpoint]["outcomes"][outcome] = count
+        for (endpoint, phase), histogram in self._histograms.items():
+            result.setdefault(endpoint, {"requests": 0, "retries": 0, "outcomes": {}, "phases": {}})
+            result[endpoint]["phases"][phase] = histogram.snapshot()
+        return result
+
+    def prometheus(self, prefix: str = "xhshow") -> str:
+        """
+        导出为 Prometheus 文本格式
+
+        Args:
+            prefix: 指标名前缀
+        Returns:
+            {prefix}_request_phase_seconds 直方图 与 {prefix}_requests_total、{prefix}_request_retries_total 计数
+        """
+        name = f"{prefix}_request_phase_seconds"
+        lines = [f"# HELP {name} 请求各阶段耗时", f"# TYPE {name} histogram"]
+        for (endpoint, phase), histogram in sorted(self._histograms.items()):
+            labels = f'endpoint="{_escape(endpoint)}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip((*histogram.buckets, float('inf')), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        name = f"{prefix}_requests_total"
+        lines += [f"# HELP {name} 请求数 按状态码或错误类型", f"# TYPE {name} counter"]
+        for (endpoint, outcome), count in sorted(self._statuses.items()):
+            lines.append(f'{name}{{endpoint="{_escape(endpoint)}",outcome="{_escape(outcome)}"}} {count}')
+
+        name = f"{prefix}_request_retries_total"
+        lines += [f"# HELP {name} 重试次数", f"# TYPE {name} counter"]
+        for endpoint, count in sorted(self._retries.items()):
+            lines.append(f'{name}{{endpoint="{_escape(endpoint)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        self._histograms.clear()
+        self._requests.clear()
+        self._retries.clear()
+        self._statuses.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")